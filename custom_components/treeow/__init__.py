@@ -1,8 +1,8 @@
 import asyncio
+import copy
 import logging
-import threading
 import time
-from typing import Optional
+from typing import Dict
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
@@ -16,84 +16,223 @@ from .const import (
     TOKEN_REFRESH_THRESHOLD,
     TOKEN_RETRY_DELAY,
     TOKEN_RETRY_MULTIPLIER,
-    TOKEN_MAX_RETRY_DELAY
+    TOKEN_MAX_RETRY_DELAY,
+    RETRY_DELAY,
+    RETRY_MULTIPLIER,
+    MAX_RETRY_DELAY
 )
-from .core.client import TreeowClient, TreeowClientException, initialize_versions
+from .core.client import TokenInfo, TreeowClient, TreeowClientException, load_cached_versions, refresh_versions
 from .core.config import AccountConfig, DeviceFilterConfig, EntityFilterConfig
+from .core.event import dispatch_device_data
+from .core.snapshot import TreeowSnapshotStore
 
 _LOGGER = logging.getLogger(__name__)
 
+# Entry data applied incrementally, without a reload
+_FILTER_DATA_KEYS = ('device_filter', 'entity_filter', 'entity_filter_updated_at')
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Optimized setup entry with reduced initialization time."""
     hass.data.setdefault(DOMAIN, {
         'devices': [],
-        'signals': [],
-        'client': None
+        'tasks': [],
+        'client': None,
+        'platforms': {},
+        'entities': {}
     })
 
     # Initialize client and token management
     account_cfg = AccountConfig(hass, entry)
     
-    # Initialize versions and create client
-    app_version, ios_version = await initialize_versions(hass)
-    client = TreeowClient(hass, account_cfg.access_token, app_version, ios_version)
+    # Create client with the cached versions, stale versions are refreshed in the background
+    app_version, ios_version, versions_stale = await load_cached_versions(hass)
+    client = TreeowClient(hass, account_cfg.access_token, app_version, ios_version, account_cfg.max_concurrent_requests)
     hass.data[DOMAIN]['client'] = client
+    # Rejected tokens are renewed on demand, the failed request is replayed
+    client.set_auth_handler(lambda: _async_renew_token(hass, account_cfg))
+    if versions_stale:
+        _start_task(hass, refresh_versions(hass, client), 'treeow-version-refresh')
     
-    # Verify and update token if needed
-    await _try_update_token(hass, entry, account_cfg)
-    
-    try:
-        # Get devices
-        devices = await client.get_devices()
-        _LOGGER.debug(f'Retrieved {len(devices)} devices')
-        hass.data[DOMAIN]['devices'] = devices
-        
-    except Exception as e:
-        _LOGGER.error(f'Device initialization failed: {e}')
-        hass.data.pop(DOMAIN, None)
-        return False
+    # Fast start: bring devices up from the persisted snapshot, the cloud reconciles in the background
+    snapshot = TreeowSnapshotStore(hass, entry.entry_id)
+    hass.data[DOMAIN]['snapshot'] = snapshot
+    await client.async_load_models()
+    devices = await snapshot.async_restore(client)
+    restored = bool(devices)
+    incomplete = set()
+
+    if restored:
+        _LOGGER.debug(f'Restored {len(devices)} devices from snapshot')
+    else:
+        try:
+            # Get devices, digital models come from the shared model cache
+            devices, incomplete = await client.discover_devices()
+            _LOGGER.debug(f'Retrieved {len(devices)} devices')
+            # Models of devices missing from a partial discovery are still needed
+            if not incomplete:
+                await client.async_gc_models(devices)
+
+        except Exception as e:
+            _LOGGER.error(f'Device initialization failed: {e}')
+            for task in hass.data[DOMAIN]['tasks']:
+                task.cancel()
+            await client.async_shutdown()
+            hass.data.pop(DOMAIN, None)
+            return False
+
+    hass.data[DOMAIN]['devices'] = devices
+    snapshot.track(devices)
+
+    # Filters are applied in a single pass, platforms read their entities and the listener its devices from it
+    index = hass.data[DOMAIN]['platform_index'] = _build_platform_index(hass, entry, devices)
 
-    signals = hass.data[DOMAIN]['signals']
-    
     # Token updater task
-    token_signal = threading.Event()
-    signals.append(token_signal)
-    hass.async_create_background_task(
-        _token_updater(hass, entry, token_signal, account_cfg), 
-        'treeow-token-updater'
-    )
+    _start_task(hass, _token_updater(hass, account_cfg), 'treeow-token-updater')
 
     # Device listener task
-    device_signal = threading.Event()
-    signals.append(device_signal)
-    hass.async_create_background_task(
-        client.listen_devices(devices, device_signal, account_cfg.poll_interval), 
+    _start_task(
+        hass,
+        client.listen_devices(
+            _indexed_devices(index),
+            account_cfg.poll_interval,
+            account_cfg.min_poll_interval,
+            account_cfg.max_poll_interval,
+            account_cfg.optimistic_command,
+            account_cfg.command_confirm_timeout
+        ),
         'treeow-listener'
     )
 
     # Setup platforms
     await hass.config_entries.async_forward_entry_setups(entry, SUPPORTED_PLATFORMS)
 
+    # Reconcile restored devices with the cloud, or finish a partial discovery
+    if restored or incomplete:
+        _start_task(hass, _device_reconciler(hass, entry), 'treeow-reconciler')
+
     # Register update listener
+    hass.data[DOMAIN]['config_data'] = _reload_relevant_data(hass, entry)
     entry.async_on_unload(entry.add_update_listener(_entry_update_listener))
 
     return True
 
 
-async def _token_updater(hass: HomeAssistant, entry: ConfigEntry, signal: threading.Event, account_cfg: Optional[AccountConfig] = None):
-    """Optimized token updater with exponential backoff retry."""
+def _start_task(hass: HomeAssistant, coro, name: str) -> asyncio.Task:
+    """Start a background task owned by the entry, it is cancelled and awaited on unload."""
+    tasks = hass.data[DOMAIN]['tasks']
+    task = hass.async_create_background_task(coro, name)
+    tasks.append(task)
+
+    def discard(done: asyncio.Task) -> None:
+        if done in tasks:
+            tasks.remove(done)
+
+    task.add_done_callback(discard)
+    return task
+
+
+async def _device_reconciler(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Discover devices from the cloud and reconcile them with the restored ones, retrying with backoff
+    until every group has been fully listed."""
+    retry_delay = RETRY_DELAY
+
+    while True:
+        try:
+            client = hass.data[DOMAIN]['client']
+            devices, incomplete = await client.discover_devices()
+            await _async_reconcile_devices(hass, entry, devices, incomplete)
+            if not incomplete:
+                await client.async_gc_models(devices)
+                return
+
+            _LOGGER.warning(f'Groups {sorted(incomplete)} partially discovered, keeping their devices and retrying in {retry_delay} seconds')
+
+        except Exception as e:
+            _LOGGER.warning(f'Device discovery failed: {e}, keeping restored devices and retrying in {retry_delay} seconds')
+
+        await asyncio.sleep(retry_delay)
+        retry_delay = min(retry_delay * RETRY_MULTIPLIER, MAX_RETRY_DELAY)
+
+
+async def _async_reconcile_devices(hass: HomeAssistant, entry: ConfigEntry, discovered: list, incomplete_groups=()) -> None:
+    """Add, remove or refresh devices and their entities from the discovered device list.
+
+    Devices missing from the list are only removed when their group was fully listed.
+    """
+    domain_data = hass.data[DOMAIN]
+    current = {str(device.id): device for device in domain_data['devices']}
+    discovered_ids = {str(d.id) for d in discovered}
+    devices = []
+    added = []
+    removed = []
+    for device_id, device in current.items():
+        if device_id in discovered_ids:
+            continue
+        if str(device.group_id) in incomplete_groups:
+            # Not listed because discovery of its group failed, keep it
+            devices.append(device)
+        else:
+            removed.append(device_id)
+
+    for device in discovered:
+        device_id = str(device.id)
+        existing = current.get(device_id)
+        if existing is None:
+            devices.append(device)
+            added.append(device)
+        elif _attribute_signature(existing) != _attribute_signature(device):
+            # The model changed, rebuild the device's entities
+            removed.append(device_id)
+            devices.append(device)
+            added.append(device)
+        else:
+            # Same entities, publish the live values to them
+            values = existing.attribute_snapshot_data
+            changes = {k: v for k, v in device.attribute_snapshot_data.items() if values.get(k) != v}
+            values.update(changes)
+            if existing.stale:
+                existing.stale = False
+                dispatch_device_data(hass, device_id, dict(values))
+            elif changes:
+                dispatch_device_data(hass, device_id, changes)
+            devices.append(existing)
+
+    await _async_remove_device_entities(hass, removed)
+    domain_data['devices'] = devices
+    _async_add_device_entities(hass, entry, added)
+    domain_data['client'].set_listened_devices(_listened_devices(hass, devices))
+    domain_data['snapshot'].track(devices)
+
+    if added or removed:
+        _LOGGER.info(f'Device reconciliation done: {len(added)} added, {len(removed)} removed')
+
+
+def _attribute_signature(device) -> set:
+    return {(attribute.key, attribute.platform) for attribute in device.attributes}
+
+
+async def _token_updater(hass: HomeAssistant, account_cfg: AccountConfig):
+    """Renew the token ahead of its known expiry, rejections in between are handled by the client."""
     token_retry_delay = TOKEN_RETRY_DELAY
     
-    while not signal.is_set():
+    while True:
+        # Re-read the expiry at least hourly, reactive renewals move it forward
+        refresh_in = account_cfg.expires_at - TOKEN_REFRESH_THRESHOLD - int(time.time())
+        if refresh_in > 0:
+            await asyncio.sleep(min(refresh_in, TOKEN_CHECK_INTERVAL))
+            continue
+
         try:
-            if await _try_update_token(hass, entry, account_cfg):
-                _LOGGER.info('Token refreshed, reloading integration...')
-                await hass.config_entries.async_reload(entry.entry_id)
-                break
+            await hass.data[DOMAIN]['client'].reauthenticate()
+            _LOGGER.info('Token refreshed ahead of expiry, swapped into the running client')
             
             # Reset retry delay on successful token update
             token_retry_delay = TOKEN_RETRY_DELAY
+
+            # Guard against tokens issued without a usable lifetime
+            if account_cfg.expires_at - TOKEN_REFRESH_THRESHOLD <= int(time.time()):
+                await asyncio.sleep(TOKEN_CHECK_INTERVAL)
             
         except Exception as e:
             _LOGGER.error(f'Token update failed: {e}, retrying in {token_retry_delay} seconds')
@@ -104,53 +243,27 @@ async def _token_updater(hass: HomeAssistant, entry: ConfigEntry, signal: thread
             # Exponential backoff: double the delay for next retry
             token_retry_delay = min(token_retry_delay * TOKEN_RETRY_MULTIPLIER, TOKEN_MAX_RETRY_DELAY)
             _LOGGER.debug(f'Token updater next retry delay set to {token_retry_delay} seconds')
-            continue
-            
-        # Wait for next check or signal
-        await asyncio.sleep(TOKEN_CHECK_INTERVAL)
 
 
-async def _try_update_token(hass: HomeAssistant, entry: ConfigEntry, account_cfg: Optional[AccountConfig] = None) -> bool:
-    """Optimized token update with better error handling."""
-    if account_cfg is None:
-        account_cfg = AccountConfig(hass, entry)
-    
-    client = hass.data[DOMAIN].get('client')
-    if client is None:
-        # Create temporary client with default versions for token operations
-        client = TreeowClient(hass, account_cfg.access_token)
-    
+async def _async_renew_token(hass: HomeAssistant, account_cfg: AccountConfig) -> None:
+    """Renew the credentials with the refresh token, falling back to a re-login with username and password."""
+    client = hass.data[DOMAIN]['client']
     try:
-        # Check token validity
-        try:
-            await client.verify_token()
-        except TreeowClientException:
-            # Token invalid, refresh using login
-            _LOGGER.info('Token invalid, re-login with username and password')
-            token_info = await client.login(account_cfg.account, account_cfg.password)
-            account_cfg.access_token = token_info.access_token
-            account_cfg.refresh_token = token_info.refresh_token
-            account_cfg.expires_at = token_info.expires_at
-            account_cfg.save()
-            return True
-
-        # Check if token needs refresh (less than 1 day remaining)
-        time_until_expiry = account_cfg.expires_at - int(time.time())
-        if time_until_expiry > TOKEN_REFRESH_THRESHOLD:
-            return False
-
-        # Refresh token proactively
         token_info = await client.refresh_token(account_cfg.refresh_token)
-        account_cfg.access_token = token_info.access_token
-        account_cfg.refresh_token = token_info.refresh_token
-        account_cfg.expires_at = token_info.expires_at
-        account_cfg.save()
+    except TreeowClientException as e:
+        _LOGGER.info(f'Token refresh rejected ({e}), re-login with username and password')
+        token_info = await client.login(account_cfg.account, account_cfg.password)
+    _save_token(client, account_cfg, token_info)
 
-        return True
-        
-    except Exception as e:
-        _LOGGER.error(f'Token update process failed: {e}')
-        raise
+
+def _save_token(client: TreeowClient, account_cfg: AccountConfig, token_info: TokenInfo) -> None:
+    """Persist new credentials and hand the access token to the running client."""
+    account_cfg.access_token = token_info.access_token
+    account_cfg.refresh_token = token_info.refresh_token
+    account_cfg.expires_at = token_info.expires_at
+    client.set_access_token(token_info.access_token)
+    # Token-only updates are skipped by the update listener, no reload happens
+    account_cfg.save()
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -163,10 +276,19 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = all(result is True for result in unload_results)
 
     if unload_ok:
-        # Signal all background tasks to stop
-        signals = hass.data[DOMAIN].get('signals', [])
-        for signal in signals:
-            signal.set()
+        # Cancel all background tasks and wait until they are gone, so a reload never overlaps them
+        tasks = list(hass.data[DOMAIN].get('tasks', []))
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        client = hass.data[DOMAIN].get('client')
+        if client is not None:
+            await client.async_shutdown()
+
+        snapshot = hass.data[DOMAIN].get('snapshot')
+        if snapshot is not None:
+            await snapshot.async_stop()
 
         # Clean up domain data
         hass.data.pop(DOMAIN, None)
@@ -175,10 +297,37 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 
 async def _entry_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Optimized update listener."""
+    """Reload on configuration changes, credential rotations are applied in place."""
+    domain_data = hass.data.get(DOMAIN)
+    config_data = _reload_relevant_data(hass, entry)
+    if domain_data is not None:
+        old_config_data = domain_data.get('config_data')
+        if old_config_data == config_data:
+            _LOGGER.debug('Only credentials changed, skipping reload')
+            return
+
+        if old_config_data is not None and _without_filters(old_config_data) == _without_filters(config_data):
+            domain_data['config_data'] = config_data
+            await _async_apply_filters(hass, entry)
+            return
+
     await hass.config_entries.async_reload(entry.entry_id)
 
 
+def _without_filters(config_data: dict) -> dict:
+    return {key: value for key, value in config_data.items() if key not in _FILTER_DATA_KEYS}
+
+
+def _reload_relevant_data(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Entry data without the credentials that rotate while running.
+
+    Account settings are compared as normalized values, so an entry saved before a setting existed
+    doesn't look changed once a token save writes its default.
+    """
+    account = AccountConfig(hass, entry).settings()
+    return copy.deepcopy({**entry.data, 'account': account, 'options': dict(entry.options)})
+
+
 async def async_remove_config_entry_device(hass: HomeAssistant, config: ConfigEntry, device: DeviceEntry) -> bool:
     """Optimized device removal with better error handling."""
     device_identifiers = list(device.identifiers)
@@ -220,34 +369,125 @@ async def async_remove_config_entry_device(hass: HomeAssistant, config: ConfigEn
 
 async def async_register_entity(hass: HomeAssistant, entry: ConfigEntry, async_add_entities, platform, setup) -> None:
     """Optimized entity registration with batch processing."""
-    devices = hass.data[DOMAIN].get('devices', [])
+    domain_data = hass.data[DOMAIN]
+    domain_data['platforms'][platform] = (async_add_entities, setup)
+
+    devices = domain_data.get('devices', [])
     if not devices:
         _LOGGER.warning('No devices available')
         return
 
-    entities = []
+    # Built once in setup, every platform reads only its own list
+    entities = _create_entities(hass, domain_data['platform_index'].pop(platform, []), setup)
+    if entities:
+        async_add_entities(entities)
+
+
+def _build_platform_index(hass: HomeAssistant, entry: ConfigEntry, devices) -> Dict[str, list]:
+    """Attributes left after filtering, grouped by platform, in a single pass over all devices."""
+    index = {}
+    device_entities = hass.data[DOMAIN]['entities']
     device_filter_config = DeviceFilterConfig(hass, entry)
     entity_filter_config = EntityFilterConfig(hass, entry)
-    
+
     for device in devices:
+        device_id = str(device.id)
+
         # Skip filtered devices
-        if device_filter_config.is_skip(str(device.id)):
+        if device_filter_config.is_skip(device_id):
             continue
 
-        # Process device attributes
+        existing = device_entities.get(device_id, {})
         for attribute in device.attributes:
-            if attribute.platform != platform:
+            # Skip filtered entities, and those already added when filters change
+            if entity_filter_config.is_skip(device_id, attribute.key) or attribute.key in existing:
                 continue
 
-            # Skip filtered entities
-            if entity_filter_config.is_skip(str(device.id), attribute.key):
-                continue
+            index.setdefault(attribute.platform, []).append((device, attribute))
 
-            try:
-                entity = setup(device, attribute)
-                entities.append(entity)
-            except Exception as e:
-                _LOGGER.warning(f'Failed to create entity - device: {device.id}, attribute: {attribute.key}, error: {e}')
+    return index
 
-    if entities:
-        async_add_entities(entities)
+
+def _create_entities(hass: HomeAssistant, items: list, setup) -> list:
+    """Create entities for indexed (device, attribute) pairs of one platform."""
+    entities = []
+    device_entities = hass.data[DOMAIN]['entities']
+
+    for device, attribute in items:
+        try:
+            entity = setup(device, attribute)
+            entities.append(entity)
+            device_entities.setdefault(str(device.id), {})[attribute.key] = entity
+        except Exception as e:
+            _LOGGER.warning(f'Failed to create entity - device: {device.id}, attribute: {attribute.key}, error: {e}')
+
+    return entities
+
+
+def _async_add_device_entities(hass: HomeAssistant, entry: ConfigEntry, devices) -> int:
+    """Add the missing entities of devices to the platforms already set up, returns how many were added."""
+    if not devices:
+        return 0
+
+    added = 0
+    index = _build_platform_index(hass, entry, devices)
+    for platform, (async_add_entities, setup) in hass.data[DOMAIN]['platforms'].items():
+        entities = _create_entities(hass, index.get(platform, []), setup)
+        if entities:
+            async_add_entities(entities)
+            added += len(entities)
+    return added
+
+
+async def _async_remove_device_entities(hass: HomeAssistant, device_ids) -> None:
+    """Remove the entities of devices from Home Assistant, their registry entries are kept."""
+    device_entities = hass.data[DOMAIN]['entities']
+    for device_id in device_ids:
+        for entity in device_entities.pop(device_id, {}).values():
+            await _async_remove_entity(entity)
+
+
+async def _async_remove_entity(entity) -> None:
+    try:
+        await entity.async_remove(force_remove=True)
+    except Exception as e:
+        _LOGGER.warning(f'Failed to remove entity {entity.entity_id}: {e}')
+
+
+async def _async_apply_filters(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Bring entities and listened devices in line with changed filters, touching only what changed."""
+    domain_data = hass.data[DOMAIN]
+    devices = domain_data['devices']
+    device_entities = domain_data['entities']
+    device_filter_config = DeviceFilterConfig(hass, entry)
+    entity_filter_config = EntityFilterConfig(hass, entry)
+
+    removed = 0
+    for device in devices:
+        device_id = str(device.id)
+        entities = device_entities.get(device_id, {})
+        for key in list(entities):
+            if device_filter_config.is_skip(device_id) or entity_filter_config.is_skip(device_id, key):
+                await _async_remove_entity(entities.pop(key))
+                removed += 1
+        if not entities:
+            device_entities.pop(device_id, None)
+
+    added = _async_add_device_entities(hass, entry, devices)
+    domain_data['client'].set_listened_devices(_listened_devices(hass, devices))
+    _LOGGER.info(f'Filters applied: {added} entities added, {removed} removed')
+
+
+def _listened_devices(hass: HomeAssistant, devices) -> list:
+    """Devices with at least one entity, the only ones worth polling and heartbeating."""
+    device_entities = hass.data[DOMAIN]['entities']
+    return [device for device in devices if device_entities.get(str(device.id))]
+
+
+def _indexed_devices(index: Dict[str, list]) -> list:
+    """Devices with at least one attribute left in the platform index."""
+    devices = {}
+    for items in index.values():
+        for device, _ in items:
+            devices.setdefault(str(device.id), device)
+    return list(devices.values())
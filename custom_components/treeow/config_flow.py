@@ -7,7 +7,16 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.config_validation import multi_select
 
-from .const import DOMAIN, FILTER_TYPE_EXCLUDE, FILTER_TYPE_INCLUDE, DEFAULT_POLL_INTERVAL
+from .const import (
+    DOMAIN,
+    FILTER_TYPE_EXCLUDE,
+    FILTER_TYPE_INCLUDE,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_COMMAND_CONFIRM_TIMEOUT,
+    DEFAULT_MAX_CONCURRENT_REQUESTS
+)
 from .core.client import TreeowClientException, TreeowClient
 from .core.config import AccountConfig, DeviceFilterConfig, EntityFilterConfig
 
@@ -88,6 +97,13 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         cfg = AccountConfig(self.hass, self.config_entry)
 
         if user_input is not None:
+            poll_interval = user_input.get('poll_interval', DEFAULT_POLL_INTERVAL)
+            min_poll_interval = user_input.get('min_poll_interval', DEFAULT_MIN_POLL_INTERVAL)
+            max_poll_interval = user_input.get('max_poll_interval', DEFAULT_MAX_POLL_INTERVAL)
+            if not min_poll_interval <= poll_interval <= max_poll_interval:
+                errors['base'] = 'invalid_poll_interval'
+
+        if user_input is not None and not errors:
             try:
                 # 获取token
                 client = TreeowClient(self.hass, '')
@@ -99,7 +115,12 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 cfg.refresh_token = token_info.refresh_token
                 cfg.expires_at = token_info.expires_at
                 cfg.default_load_all_entity = user_input['default_load_all_entity']
-                cfg.poll_interval = user_input.get('poll_interval', DEFAULT_POLL_INTERVAL)
+                cfg.poll_interval = poll_interval
+                cfg.min_poll_interval = min_poll_interval
+                cfg.max_poll_interval = max_poll_interval
+                cfg.optimistic_command = user_input.get('optimistic_command', False)
+                cfg.command_confirm_timeout = user_input.get('command_confirm_timeout', DEFAULT_COMMAND_CONFIRM_TIMEOUT)
+                cfg.max_concurrent_requests = user_input.get('max_concurrent_requests', DEFAULT_MAX_CONCURRENT_REQUESTS)
                 cfg.save()  # Will trigger update_listener which reloads the integration
 
                 return self.async_create_entry(title='', data={})
@@ -115,6 +136,11 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     vol.Required(password, default=cfg.password): str,
                     vol.Required('default_load_all_entity', default=cfg.default_load_all_entity): bool,
                     vol.Required('poll_interval', default=cfg.poll_interval): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+                    vol.Required('min_poll_interval', default=cfg.min_poll_interval): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+                    vol.Required('max_poll_interval', default=cfg.max_poll_interval): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+                    vol.Required('optimistic_command', default=cfg.optimistic_command): bool,
+                    vol.Required('command_confirm_timeout', default=cfg.command_confirm_timeout): vol.All(vol.Coerce(int), vol.Range(min=1, max=120)),
+                    vol.Required('max_concurrent_requests', default=cfg.max_concurrent_requests): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
                 }
             ),
             errors=errors
@@ -186,9 +212,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
             cfg.set_filter_type(user_input['device_id'], user_input['filter_type'])
             cfg.set_target_entities(user_input['device_id'], user_input['target_entities'])
-            cfg.save()
-
-            await self.hass.config_entries.async_reload(self.config_entry.entry_id)
+            cfg.save()  # Will trigger update_listener which applies the filter in place
 
             return self.async_create_entry(title='', data={})
 
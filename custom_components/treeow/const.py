@@ -16,7 +16,6 @@ FILTER_TYPE_EXCLUDE = 'exclude'
 # API Endpoints
 LOGIN_API = 'https://eziotes.treeow.com.cn/api/user/account/login'
 REFRESH_TOKEN_API = 'https://eziotes.treeow.com.cn/api/user/account/refresh/token'
-VERIFY_TOKEN_API = 'https://eziotes.treeow.com.cn/api/msg/unread/count'
 DESCRIBE_DEVICES_API = 'https://eziotes.treeow.com.cn/api/resource/device/info'
 SYNC_DEVICES_API = 'https://eziotes.treeow.com.cn/api/v3/device/otap/prop'
 LIST_DEVICES_API = 'https://eziotes.treeow.com.cn/api/resource/v3/device/list/page'
@@ -26,28 +25,48 @@ GET_IOS_VERSION_API = 'https://endoflife.date/api/v1/products/ios/releases/lates
 
 # Timing Constants
 HEARTBEAT_INTERVAL = 10  # seconds
+HEARTBEAT_RETRY_DELAY = 1  # seconds (initial retry delay after a failed heartbeat)
+HEARTBEAT_JITTER = 0.1  # fraction of the heartbeat interval added as random jitter
 DEFAULT_POLL_INTERVAL = 5  # seconds
+DEFAULT_MIN_POLL_INTERVAL = 2  # seconds (right after a command or value change)
+DEFAULT_MAX_POLL_INTERVAL = 60  # seconds (steady or switched off devices)
+POLL_BACKOFF_MULTIPLIER = 1.5  # poll interval multiplier while readings stay steady
+OFFLINE_POLL_MULTIPLIER = 5  # offline or unavailable devices are polled at max interval times this
+DEVICE_UNAVAILABLE_FAILURES = 3  # consecutive poll or heartbeat failures before a device is marked unavailable
 RETRY_DELAY = 5  # seconds
 RETRY_MULTIPLIER = 2  # retry delay multiplier
 MAX_RETRY_DELAY = 60  # seconds
+REQUEST_TIMEOUT = 10  # seconds (hard deadline for every cloud request)
+COMMAND_TIMEOUT = 10  # seconds (shared deadline for all property writes of one command)
+COMMAND_DEBOUNCE = 0.3  # seconds (rapid writes within this window are coalesced per device)
+DEFAULT_COMMAND_CONFIRM_TIMEOUT = 15  # seconds (optimistic values not confirmed by a poll are reverted)
+
+# Request Executor Constants
+DEFAULT_MAX_CONCURRENT_REQUESTS = 6
+REQUEST_PRIORITY_COMMAND = 0  # user commands jump ahead of everything else
+REQUEST_PRIORITY_NORMAL = 1  # setup and discovery
+REQUEST_PRIORITY_BACKGROUND = 2  # polls and heartbeats
 
 # Other Constants
 DEFAULT_PAGE_SIZE = 50
+MAX_PAGES = 100  # safety limit when following device list pages
 DEFAULT_APP_VERSION = '1.1.8'
 DEFAULT_IOS_VERSION = '18.5'
 
 # Storage Constants
 STORAGE_VERSION = 1
 STORAGE_KEY = "treeow"
-
-# Event Constants
-EVENT_DEVICE_CONTROL = 'device_control'
-EVENT_DEVICE_DATA_CHANGED = 'device_data_changed'
-EVENT_GATEWAY_STATUS_CHANGED = 'gateway_status_changed'
+MODEL_STORAGE_NAME = "models"
+MODEL_SAVE_DELAY = 10  # seconds (batch model cache writes)
+VERSION_STORAGE_NAME = "versions"
+SNAPSHOT_STORAGE_NAME = "snapshot"
+SNAPSHOT_SAVE_DELAY = 60  # seconds (batch snapshot writes of changed values)
+VERSION_CACHE_TTL = 86400  # seconds (app and iOS versions are refreshed in the background once a day)
 
 # Token Management Constants
-TOKEN_CHECK_INTERVAL = 3600  # 1 hour
+TOKEN_CHECK_INTERVAL = 3600  # 1 hour (longest sleep before re-reading the known expiry, no request is made)
 TOKEN_REFRESH_THRESHOLD = 86400  # 1 day
 TOKEN_RETRY_DELAY = 30  # seconds (initial retry delay for token operations)
 TOKEN_RETRY_MULTIPLIER = 2  # retry delay multiplier
-TOKEN_MAX_RETRY_DELAY = 300  # seconds (5 minutes max retry delay)
\ No newline at end of file
+TOKEN_MAX_RETRY_DELAY = 300  # seconds (5 minutes max retry delay)
+AUTH_ERROR_CODES = (401, 403)  # HTTP statuses and response codes meaning the access token was rejected
\ No newline at end of file
@@ -2,20 +2,21 @@ import asyncio
 import hashlib
 import json
 import logging
-import threading
 import time
 import uuid
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Callable, Set, Tuple
+import aiohttp
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.storage import Store
+from .command import DeviceCommandActor
 from .device import TreeowDevice
-from .event import listen_event, fire_event
+from .executor import TreeowRequestExecutor
+from .model import TreeowModelRegistry, TreeowModelStore, profile_key
+from .event import dispatch_device_data, dispatch_device_availability
+from .scheduler import DeviceHealth, DevicePollSchedule, HeartbeatScheduler, HeartbeatStatus
 from custom_components.treeow import const
 from custom_components.treeow.const import (
-    EVENT_DEVICE_CONTROL,
-    EVENT_DEVICE_DATA_CHANGED,
-    EVENT_GATEWAY_STATUS_CHANGED,
     DEFAULT_APP_VERSION,
     DEFAULT_IOS_VERSION
 )
@@ -23,13 +24,22 @@ from custom_components.treeow.const import (
 _LOGGER = logging.getLogger(__name__)
 
 
-async def initialize_versions(hass: HomeAssistant) -> tuple[str, str]:
-    app_version = DEFAULT_APP_VERSION
-    ios_version = DEFAULT_IOS_VERSION
+async def initialize_versions(
+        hass: HomeAssistant,
+        app_version: str = DEFAULT_APP_VERSION,
+        ios_version: str = DEFAULT_IOS_VERSION
+) -> tuple[str, str, bool]:
+    """Look up the latest app and iOS versions, falling back to the given versions.
 
+    The last item tells whether at least one of the lookups resolved a version.
+    """
+
+    # Third-party lookups (App Store, endoflife.date), they stay outside the cloud request executor
     session = async_get_clientsession(hass)
+    resolved = False
+
     async def get_app_version():
-        nonlocal app_version
+        nonlocal app_version, resolved
         try:
             async with session.get(url=const.GET_APP_VERSION_API) as response:
                 content = await response.json(content_type=None)
@@ -38,13 +48,14 @@ async def initialize_versions(hass: HomeAssistant) -> tuple[str, str]:
                     version = results[0].get('version')
                     if version and version.replace('.', '').isdigit():
                         app_version = version
+                        resolved = True
                     else:
                         _LOGGER.warning(f'Invalid app version format: {version}, using default')
         except Exception as e:
             _LOGGER.warning(f'Failed to get app version: {e}')
     
     async def get_ios_version():
-        nonlocal ios_version
+        nonlocal ios_version, resolved
         try:
             async with session.get(url=const.GET_IOS_VERSION_API) as response:
                 content = await response.json(content_type=None)
@@ -55,6 +66,7 @@ async def initialize_versions(hass: HomeAssistant) -> tuple[str, str]:
                     if version:
                         if version.replace('.', '').isdigit():
                             ios_version = version
+                            resolved = True
                         else:
                             _LOGGER.warning(f'Invalid iOS version format: {version}, using default')
         except Exception as e:
@@ -71,7 +83,42 @@ async def initialize_versions(hass: HomeAssistant) -> tuple[str, str]:
     except Exception as e:
         _LOGGER.warning(f'Failed to initialize versions: {e}, using defaults')
     _LOGGER.debug(f'Initialized versions: app_version={app_version}, ios_version={ios_version}')
-    return app_version, ios_version
+    return app_version, ios_version, resolved
+
+
+def _version_store(hass: HomeAssistant) -> Store:
+    return Store(hass, const.STORAGE_VERSION, f'{const.STORAGE_KEY}/{const.VERSION_STORAGE_NAME}')
+
+
+async def load_cached_versions(hass: HomeAssistant) -> tuple[str, str, bool]:
+    """Persisted app and iOS versions, with whether they are stale and need a background refresh."""
+    try:
+        cache = await _version_store(hass).async_load()
+    except Exception as e:
+        _LOGGER.warning(f'Version cache is invalid: {e}')
+        cache = None
+
+    if not isinstance(cache, dict):
+        return DEFAULT_APP_VERSION, DEFAULT_IOS_VERSION, True
+
+    stale = time.time() - cache.get('updated_at', 0) > const.VERSION_CACHE_TTL
+    return cache.get('app_version', DEFAULT_APP_VERSION), cache.get('ios_version', DEFAULT_IOS_VERSION), stale
+
+
+async def refresh_versions(hass: HomeAssistant, client: 'TreeowClient') -> None:
+    """Refresh the persisted versions and apply them to the client's headers in place."""
+    app_version, ios_version, resolved = await initialize_versions(hass, client.app_version, client.ios_version)
+    if not resolved:
+        # Keep the cache stale so the next setup tries again
+        _LOGGER.debug('No version could be looked up, version cache left as is')
+        return
+
+    await _version_store(hass).async_save({
+        'app_version': app_version,
+        'ios_version': ios_version,
+        'updated_at': int(time.time())
+    })
+    client.set_versions(app_version, ios_version)
 
 
 class TokenInfo:
@@ -102,23 +149,145 @@ class TreeowClientException(Exception):
     pass
 
 
+class TreeowAuthException(TreeowClientException):
+    """The cloud rejected the access token."""
+    pass
+
+
 class TreeowClient:
     """Optimized TreeowClient with improved performance and error handling."""
 
-    __slots__ = ('_access_token', '_app_version', '_ios_version', '_hass', '_session', '_header_cache')
+    __slots__ = ('_access_token', '_app_version', '_ios_version', '_hass', '_session', '_header_cache', '_executor', '_models', '_model_store',
+                 '_profile_fetches', '_listened_devices', '_poll_config', '_poll_schedules', '_device_health',
+                 '_command_actors', '_optimistic_command',
+                 '_payload_fingerprints', '_pending_values', '_command_confirm_timeout',
+                 '_heartbeat_scheduler', '_request_timeout', '_poll_stats', '_auth_handler', '_auth_task',
+                 '_auth_error', '_auth_retry_at', '_auth_retry_delay')
 
-    def __init__(self, hass: HomeAssistant, access_token: str, app_version: str = DEFAULT_APP_VERSION, ios_version: str = DEFAULT_IOS_VERSION):
+    def __init__(
+            self,
+            hass: HomeAssistant,
+            access_token: str,
+            app_version: str = DEFAULT_APP_VERSION,
+            ios_version: str = DEFAULT_IOS_VERSION,
+            max_concurrent_requests: int = const.DEFAULT_MAX_CONCURRENT_REQUESTS
+    ):
         self._access_token = access_token
         self._app_version = app_version
         self._ios_version = ios_version
         self._hass = hass
         self._session = async_get_clientsession(hass)
         self._header_cache = None
+        self._executor = TreeowRequestExecutor(max_concurrent_requests)
+        self._models = TreeowModelRegistry()
+        self._model_store = TreeowModelStore(hass)
+        self._profile_fetches: Dict[str, asyncio.Task] = {}
+        self._listened_devices: Dict[str, TreeowDevice] = {}
+        self._poll_config = (const.DEFAULT_POLL_INTERVAL, const.DEFAULT_MIN_POLL_INTERVAL, const.DEFAULT_MAX_POLL_INTERVAL)
+        self._poll_schedules: Dict[str, DevicePollSchedule] = {}
+        self._device_health: Dict[str, DeviceHealth] = {}
+        self._command_actors: Dict[str, DeviceCommandActor] = {}
+        self._optimistic_command = False
+        self._payload_fingerprints: Dict[str, str] = {}
+        self._pending_values: Dict[str, Dict[str, tuple]] = {}
+        self._command_confirm_timeout = const.DEFAULT_COMMAND_CONFIRM_TIMEOUT
+        self._heartbeat_scheduler: Optional[HeartbeatScheduler] = None
+        self._request_timeout = aiohttp.ClientTimeout(total=const.REQUEST_TIMEOUT)
+        self._poll_stats = {
+            'cycles': 0, 'group_polls': 0, 'overrun_polls': 0, 'skipped_groups': 0,
+            'last_overrun': 0.0, 'max_overrun': 0.0
+        }
+        self._auth_handler: Optional[Callable[[], Awaitable[None]]] = None
+        self._auth_task: Optional[asyncio.Task] = None
+        self._auth_error: Optional[BaseException] = None
+        self._auth_retry_at = 0.0
+        self._auth_retry_delay = const.TOKEN_RETRY_DELAY
 
     @property
     def hass(self) -> HomeAssistant:
         return self._hass
 
+    @property
+    def app_version(self) -> str:
+        return self._app_version
+
+    @property
+    def ios_version(self) -> str:
+        return self._ios_version
+
+    def set_access_token(self, access_token: str) -> None:
+        """Swap the bearer token in place, running loops pick it up with their next headers."""
+        if access_token == self._access_token:
+            return
+        self._access_token = access_token
+        self._header_cache = None
+        _LOGGER.debug('Access token updated')
+
+    def set_auth_handler(self, handler: Callable[[], Awaitable[None]]) -> None:
+        """Set the coroutine that renews the credentials and swaps the new access token in."""
+        self._auth_handler = handler
+
+    async def reauthenticate(self) -> None:
+        """Renew the credentials through the auth handler, concurrent callers share one renewal.
+
+        After a failed renewal further attempts are refused with exponential backoff.
+        """
+        task = self._auth_task
+        if task is None:
+            if self._auth_handler is None:
+                raise TreeowAuthException('Access token rejected and no way to renew it')
+            if self._auth_error is not None and time.monotonic() < self._auth_retry_at:
+                raise TreeowAuthException(f'Token renewal failed recently, not retrying yet: {self._auth_error}')
+
+            task = self._auth_task = self._hass.async_create_background_task(self._auth_handler(), 'treeow-token-renewal')
+            task.add_done_callback(self._on_auth_done)
+        await asyncio.shield(task)
+
+    def _on_auth_done(self, task: asyncio.Task) -> None:
+        if self._auth_task is task:
+            self._auth_task = None
+        if task.cancelled():
+            return
+
+        error = task.exception()
+        if error is None:
+            self._auth_error = None
+            self._auth_retry_delay = const.TOKEN_RETRY_DELAY
+            return
+
+        self._auth_error = error
+        self._auth_retry_at = time.monotonic() + self._auth_retry_delay
+        _LOGGER.error(f'Token renewal failed: {error}, next attempt in {self._auth_retry_delay} seconds at the earliest')
+        self._auth_retry_delay = min(self._auth_retry_delay * const.TOKEN_RETRY_MULTIPLIER, const.TOKEN_MAX_RETRY_DELAY)
+
+    async def async_shutdown(self) -> None:
+        """Stop credential renewal, a renewal in progress is cancelled before it can persist anything."""
+        self._auth_handler = None
+        task = self._auth_task
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def set_versions(self, app_version: str, ios_version: str) -> None:
+        """Swap the versions used in the user agent, the next request picks them up."""
+        if (app_version, ios_version) == (self._app_version, self._ios_version):
+            return
+        self._app_version = app_version
+        self._ios_version = ios_version
+        self._header_cache = None
+        _LOGGER.debug(f'Updated versions: app_version={app_version}, ios_version={ios_version}')
+
+    @property
+    def poll_stats(self) -> Dict[str, Any]:
+        """Poll counters: group polls that finished after their slot, by how many seconds, and groups skipped
+        because their previous poll was still running."""
+        return dict(self._poll_stats)
+
+    @property
+    def request_stats(self) -> Dict[str, Any]:
+        """Request executor concurrency and queue depth metrics."""
+        return self._executor.stats
+
     async def login(self, account: str, password: str) -> TokenInfo:
         """Optimized login with better error handling."""
         try:
@@ -135,16 +304,14 @@ class TreeowClient:
                 "terminalName": "iPhone"
             }
             
-            async with self._session.post(url=const.LOGIN_API, headers=headers, json=payload) as response:
-                content = await response.json(content_type=None)
-                self._assert_response_successful(content)
+            content = await self._request('post', const.LOGIN_API, headers, payload, const.REQUEST_PRIORITY_COMMAND, False)
 
-                data = content.get('data', {})
-                return TokenInfo(
-                    data.get('accessToken', ''),
-                    data.get('refreshToken', ''),
-                    int(time.time()) + int(data.get('expiresIn', 0))
-                )
+            data = content.get('data', {})
+            return TokenInfo(
+                data.get('accessToken', ''),
+                data.get('refreshToken', ''),
+                int(time.time()) + int(data.get('expiresIn', 0))
+            )
         except TreeowClientException as e:
             _LOGGER.error(f'Login failed: {e}')
             raise
@@ -158,16 +325,14 @@ class TreeowClient:
             payload = {'refreshToken': refresh_token}
             headers = await self._generate_common_headers()
             
-            async with self._session.post(url=const.REFRESH_TOKEN_API, headers=headers, json=payload) as response:
-                content = await response.json(content_type=None)
-                self._assert_response_successful(content)
+            content = await self._request('post', const.REFRESH_TOKEN_API, headers, payload, const.REQUEST_PRIORITY_COMMAND, False)
 
-                data = content.get('data', {})
-                return TokenInfo(
-                    data.get('accessToken', ''),
-                    data.get('refreshToken', ''),
-                    int(time.time()) + int(data.get('expiresIn', 0))
-                )
+            data = content.get('data', {})
+            return TokenInfo(
+                data.get('accessToken', ''),
+                data.get('refreshToken', ''),
+                int(time.time()) + int(data.get('expiresIn', 0))
+            )
         except TreeowClientException as e:
             _LOGGER.error(f'Token refresh failed: {e}')
             raise
@@ -175,27 +340,18 @@ class TreeowClient:
             _LOGGER.error(f'Token refresh failed: {e}')
             raise TreeowClientException(f'Token refresh failed: {e}')
 
-    async def verify_token(self) -> None:
-        """Optimized token verification."""
-        try:
-            headers = await self._generate_common_headers()
-            async with self._session.post(url=const.VERIFY_TOKEN_API, headers=headers, json={}) as response:
-                content = await response.json(content_type=None)
-                self._assert_response_successful(content)
-        except TreeowClientException as e:
-            _LOGGER.warning(f'Token verification failed: {e}')
-            raise
-        except Exception as e:
-            _LOGGER.warning(f'Token verification failed: {e}')
-            raise TreeowClientException(f'Token verification failed: {e}')
-
     async def get_devices(self) -> List[TreeowDevice]:
         """Get all devices from all groups with parallel processing."""
+        devices, _ = await self.discover_devices()
+        return devices
+
+    async def discover_devices(self) -> Tuple[List[TreeowDevice], Set[str]]:
+        """Get all devices from all groups, along with the groups that could not be fully listed."""
         try:
             group_ids = await self.get_groups()
             if not group_ids:
                 _LOGGER.warning('No device groups found')
-                return []
+                return [], set()
 
             headers = await self._generate_common_headers()
             
@@ -203,13 +359,19 @@ class TreeowClient:
             results = await asyncio.gather(*tasks, return_exceptions=True)
             
             devices = []
-            for i, result in enumerate(results):
-                if isinstance(result, list):
-                    devices.extend(result)
-                elif isinstance(result, Exception):
-                    _LOGGER.error(f'Failed to get devices for group {group_ids[i]}: {result}')
+            incomplete = set()
+            for group_id, result in zip(group_ids, results):
+                if isinstance(result, BaseException):
+                    _LOGGER.error(f'Failed to get devices for group {group_id}: {result}')
+                    incomplete.add(str(group_id))
+                    continue
+
+                group_devices, complete = result
+                devices.extend(group_devices)
+                if not complete:
+                    incomplete.add(str(group_id))
 
-            return devices
+            return devices, incomplete
             
         except TreeowClientException as e:
             _LOGGER.error(f'Failed to get device list: {e}')
@@ -218,46 +380,93 @@ class TreeowClient:
             _LOGGER.error(f'Failed to get device list: {e}')
             raise TreeowClientException(f'Failed to get device list: {e}')
 
-    async def _get_devices_for_group(self, group_id: str, headers: Dict[str, str]) -> List[TreeowDevice]:
-        """Helper method to get devices for a specific group with parallel initialization."""
+    async def _get_devices_for_group(self, group_id: str, headers: Dict[str, str]) -> Tuple[List[TreeowDevice], bool]:
+        """Helper method to get devices for a specific group, initializing each page while the next one loads.
+
+        Devices that fail to initialize are left out and the group is reported as incomplete.
+        """
+        devices = []
+        init_tasks = []
+        try:
+            async for page in self._iter_group_devices(group_id, headers):
+                # Create device objects
+                for raw_device in page:
+                    raw_device['groupId'] = group_id
+                    device = TreeowDevice(self, raw_device)
+                    devices.append(device)
+                    init_tasks.append(asyncio.ensure_future(device.async_init()))
+
+            results = await asyncio.gather(*init_tasks, return_exceptions=True)
+        except BaseException:
+            for task in init_tasks:
+                task.cancel()
+            raise
+
+        initialized = []
+        for device, result in zip(devices, results):
+            if isinstance(result, BaseException):
+                _LOGGER.error(f'Failed to initialize device {device.id} of group {group_id}: {result}')
+            else:
+                initialized.append(device)
+
+        return initialized, len(initialized) == len(devices)
+
+    async def _iter_group_devices(
+            self,
+            group_id: str,
+            headers: Dict[str, str],
+            priority: int = const.REQUEST_PRIORITY_NORMAL
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield the raw devices of a group page by page until the last page."""
+        seen = set()
+        page_no = 1
+        while page_no <= const.MAX_PAGES:
+            content = await self._list_group_devices(group_id, headers, priority, page_no)
+            page = [raw_device for raw_device in content.get('data') or [] if str(raw_device.get('id')) not in seen]
+            if not page:
+                return
+
+            seen.update(str(raw_device.get('id')) for raw_device in page)
+            yield page
+
+            if len(content['data']) < const.DEFAULT_PAGE_SIZE:
+                return
+            page_no += 1
+
+        _LOGGER.warning(f'Group {group_id} has more than {const.MAX_PAGES} pages of devices, the rest is ignored')
+
+    async def _list_group_devices(
+            self,
+            group_id: str,
+            headers: Dict[str, str],
+            priority: int = const.REQUEST_PRIORITY_NORMAL,
+            page_no: int = 1
+    ) -> Dict[str, Any]:
+        """List one page of devices of a group, including their current props and digital model profiles."""
         payload = {
             "pageSize": str(const.DEFAULT_PAGE_SIZE),
             "groupId": group_id,
-            "pageNo": "1"
+            "pageNo": str(page_no)
         }
-        
-        async with self._session.post(url=const.LIST_DEVICES_API, headers=headers, json=payload) as response:
-            content = await response.json(content_type=None)
-            self._assert_response_successful(content)
-            
-            if not content.get('data'):
-                return []
-            
-            # Create device objects
-            devices = []
-            for raw_device in content['data']:
-                raw_device['groupId'] = group_id
-                device = TreeowDevice(self, raw_device)
-                devices.append(device)
-            
-            await asyncio.gather(*[device.async_init() for device in devices])
-            
-            return devices
+
+        content = await self._request('post', const.LIST_DEVICES_API, headers, payload, priority)
+
+        # Keep the profiles so devices of the same product version share one digital model
+        self._models.add_profiles(content.get('profiles'))
+        return content
 
     async def get_groups(self) -> List[str]:
         """Get device groups from API."""
         try:
             headers = await self._generate_common_headers()
-            async with self._session.post(url=const.LIST_HOME_API, headers=headers) as response:
-                content = await response.json(content_type=None)
-                self._assert_response_successful(content)
-                
-                group_ids = []
-                for home in content.get('data', []):
-                    for group in home.get('homeGroups', []):
-                        group_ids.append(group['id'])
-                
-                return group_ids
+            content = await self._request('post', const.LIST_HOME_API, headers)
+
+            group_ids = []
+            for home in content.get('data', []):
+                for group in home.get('homeGroups', []):
+                    group_ids.append(group['id'])
+
+            return group_ids
                 
         except TreeowClientException as e:
             _LOGGER.error(f'Failed to get device groups: {e}')
@@ -267,40 +476,21 @@ class TreeowClient:
             raise TreeowClientException(f'Failed to get device groups: {e}')
 
     async def get_digital_model(self, device: TreeowDevice) -> List[Dict[str, Any]]:
-        """Optimized digital model retrieval."""
+        """Digital model props of a device, resolved from the profiles shared by its product version."""
         try:
-            device_serial = device.device_serial
-            if not device_serial or ':' not in device_serial:
-                _LOGGER.warning(f'Device {device.id} invalid serial number: {device_serial}')
-                return []
-                
-            product_id = device_serial.split(':')[0]
-            pv = f"PV(productId={product_id}, version={device.version})"
-            
-            payload = {
-                "pageSize": str(const.DEFAULT_PAGE_SIZE),
-                "groupId": device.group_id,
-                "pageNo": "1"
-            }
-            
-            headers = await self._generate_common_headers()
-            async with self._session.post(url=const.LIST_DEVICES_API, json=payload, headers=headers) as response:
-                content = await response.json(content_type=None)
-                self._assert_response_successful(content)
-                
-                profiles = content.get('profiles', {})
-                if pv in profiles:
-                    resources = profiles[pv].get('resources', [])
-                    attributes = []
-                    
-                    for resource in resources:
-                        for domain in resource.get('domains', []):
-                            if domain.get('identifier') == device.category:
-                                attributes.extend(domain.get('props', []))
-                    
-                    return attributes
-                
+            product_id = device.product_id
+            if product_id is None:
+                _LOGGER.warning(f'Device {device.id} invalid serial number: {device.device_serial}')
                 return []
+
+            key = profile_key(product_id, device.version)
+            attributes = self._models.get_props(key, device.category)
+            if attributes is None:
+                # Profile not seen during discovery, list the group again once for all its devices
+                await self._refresh_group_profiles(device.group_id)
+                attributes = self._models.get_props(key, device.category)
+
+            return attributes or []
                 
         except TreeowClientException as e:
             _LOGGER.error(f'Failed to get digital model for device {device.id}: {e}')
@@ -309,46 +499,58 @@ class TreeowClient:
             _LOGGER.error(f'Failed to get digital model for device {device.id}: {e}')
             raise TreeowClientException(f'Failed to get digital model for device {device.id}: {e}')
 
+    async def _refresh_group_profiles(self, group_id: str) -> None:
+        """Re-list a group to pick up its profiles, concurrent callers share the same request."""
+        task = self._profile_fetches.get(group_id)
+        if task is None:
+            headers = await self._generate_common_headers()
+            task = asyncio.ensure_future(self._load_group_profiles(group_id, headers))
+            self._profile_fetches[group_id] = task
+            task.add_done_callback(lambda _: self._profile_fetches.pop(group_id, None))
+        await asyncio.shield(task)
+
+    async def _load_group_profiles(self, group_id: str, headers: Dict[str, str]) -> None:
+        async for _ in self._iter_group_devices(group_id, headers):
+            pass
+
+    async def async_load_models(self) -> None:
+        """Load the persisted digital models, once per client."""
+        await self._model_store.async_load()
+
+    async def async_gc_models(self, devices: List[TreeowDevice]) -> None:
+        """Remove persisted digital models that none of the devices use any more, pass a complete discovery only."""
+        keys = {profile_key(device.product_id, device.version) for device in devices if device.product_id}
+        await self._model_store.async_gc(keys)
+
+    def get_cached_digital_model(self, device: TreeowDevice) -> Optional[List[Dict[str, Any]]]:
+        """Digital model from the loaded model cache only, None when it is not cached."""
+        if device.product_id is None:
+            return None
+        return self._model_store.get(profile_key(device.product_id, device.version), device.category)
+
     async def get_digital_model_from_cache(self, device: TreeowDevice) -> List[Dict[str, Any]]:
-        """从缓存获取数字模型，若不存在或版本不匹配则从 API 获取并缓存"""
-        store = Store(
-            self._hass, 
-            const.STORAGE_VERSION, 
-            f'{const.STORAGE_KEY}/{device.category}_{device.id}.json'.lower()
-        )
-        
-        cache = None
-        try:
-            cache = await store.async_load()
-            if isinstance(cache, str):
-                raise RuntimeError('Cache is invalid')
-        except Exception as e:
-            _LOGGER.warning(f'Device {device.id} cache is invalid: {e}')
-            await store.async_remove()
-            cache = None
-        
-        # 检查缓存是否存在且版本匹配
-        if cache and cache.get('version') == device.version:
+        """从缓存获取数字模型，若不存在则从 API 获取并缓存（按产品版本共享）"""
+        await self._model_store.async_load()
+
+        product_id = device.product_id
+        if product_id is None:
+            return await self.get_digital_model(device)
+
+        key = profile_key(product_id, device.version)
+        attributes = self._model_store.get(key, device.category)
+        if attributes is not None:
             _LOGGER.debug(f'Device {device.id} get digital model from cache (version {device.version})')
-            return cache['attributes']
-        
+            return attributes
+
         # 从 API 获取
         _LOGGER.info(f'Device {device.id} fetching digital model from API (version {device.version})')
         attributes = await self.get_digital_model(device)
-        
-        # 保存到缓存
-        await store.async_save({
-            'device': {
-                'id': device.id,
-                'name': device.name,
-                'category': device.category
-            },
-            'version': device.version,
-            'attributes': attributes
-        })
-        
-        return attributes
 
+        # 保存到缓存（延迟批量写入）
+        if attributes:
+            self._model_store.set(key, device.category, attributes)
+
+        return attributes
 
     async def get_device_snapshot_data(self, device: TreeowDevice) -> tuple[Dict[str, Any], List[Dict[str, Any]]]:
         """Optimized snapshot data retrieval with attribute definitions."""
@@ -356,31 +558,29 @@ class TreeowClient:
             payload = {"id": device.id}
             headers = await self._generate_common_headers()
             
-            async with self._session.post(url=const.DESCRIBE_DEVICES_API, json=payload, headers=headers) as response:
-                content = await response.json(content_type=None)
-                self._assert_response_successful(content)
-                
-                data = content.get('data')
-                if not data:
-                    return {}, []
-                
-                # Parse device data
-                props = data.get('props', [])
-                if not props:
-                    return {}, []
-                
-                value_data = json.loads(props[0]['value']).get(device.category, {})
-                
-                # Get attributes and build snapshot
-                attributes = await self.get_digital_model_from_cache(device)
-                values = {}
-                
-                for attribute in attributes:
-                    identifier = attribute.get('identifier')
-                    if identifier and identifier in value_data:
-                        values[identifier] = value_data[identifier]
-                
-                return values, attributes
+            content = await self._request('post', const.DESCRIBE_DEVICES_API, headers, payload)
+
+            data = content.get('data')
+            if not data:
+                return {}, []
+
+            # Parse device data
+            props = data.get('props', [])
+            if not props:
+                return {}, []
+
+            value_data = json.loads(props[0]['value']).get(device.category, {})
+
+            # Get attributes and build snapshot
+            attributes = await self.get_digital_model_from_cache(device)
+            values = {}
+
+            for attribute in attributes:
+                identifier = attribute.get('identifier')
+                if identifier and identifier in value_data:
+                    values[identifier] = value_data[identifier]
+
+            return values, attributes
                 
         except TreeowClientException as e:
             _LOGGER.error(f'Failed to get snapshot data for device {device.id}: {e}')
@@ -389,69 +589,72 @@ class TreeowClient:
             _LOGGER.error(f'Failed to get snapshot data for device {device.id}: {e}')
             raise TreeowClientException(f'Failed to get snapshot data for device {device.id}: {e}')
 
-    async def listen_devices(self, target_devices: List[TreeowDevice], signal: threading.Event, poll_interval: int = const.DEFAULT_POLL_INTERVAL) -> None:
-        """Optimized device listening with better resource management and exponential backoff retry."""
-        process_id = str(uuid.uuid4())
-        self._hass.data['current_listen_devices_process_id'] = process_id
-        
-        cancel_control_listen = None
-        heartbeat_tasks = []
+    async def listen_devices(
+            self,
+            target_devices: List[TreeowDevice],
+            poll_interval: int = const.DEFAULT_POLL_INTERVAL,
+            min_poll_interval: int = const.DEFAULT_MIN_POLL_INTERVAL,
+            max_poll_interval: int = const.DEFAULT_MAX_POLL_INTERVAL,
+            optimistic_command: bool = False,
+            command_confirm_timeout: int = const.DEFAULT_COMMAND_CONFIRM_TIMEOUT
+    ) -> None:
+        """Optimized device listening with per-device adaptive polling and exponential backoff retry.
+
+        Runs until cancelled, cancellation stops the heartbeats and in-flight polls before returning.
+        """
+        heartbeat_task = None
+        in_flight: Dict[str, asyncio.Task] = {}
         retry_delay = const.RETRY_DELAY  # Initial retry delay
         
-        # Create device ID to TreeowDevice mapping for quick lookup during control
-        device_map = {str(device.id): device for device in target_devices}
+        # Each device gets its own poll schedule, the loop ticks at the fastest possible interval
+        self._poll_config = (poll_interval, min_poll_interval, max_poll_interval)
+        self._listened_devices = {}
+        self._poll_schedules = {}
+        self.set_listened_devices(target_devices)
+        tick_interval = max(1, min(min_poll_interval, poll_interval))
+        self._command_confirm_timeout = command_confirm_timeout
+        self._optimistic_command = optimistic_command
         
         try:
-            # Start heartbeat tasks
-            for device in target_devices:
-                heartbeat_signal = threading.Event()
-                task = self._hass.async_create_background_task(
-                    self._send_heartbeat(device, heartbeat_signal),
-                    f'treeow-heartbeat-{device.id}'
-                )
-                heartbeat_tasks.append((task, heartbeat_signal))
-
-            # Set up control event listener
-            async def control_callback(event):
-                """Handle device control events asynchronously with immediate state polling."""
-                device_dict = event.data['device']
-                device_id = str(device_dict.get('id'))
-                command_attrs = event.data['attributes']
-                
-                try:
-                    await self._send_command(device_dict, command_attrs)
-                    _LOGGER.debug(f'Command sent successfully for device {device_id}: {command_attrs}')
-                        
-                except Exception as e:
-                    _LOGGER.error(f'Failed to send command for device {device_id} with attributes {command_attrs}: {e}')
+            # Start the heartbeat scheduler shared by all devices
+            heartbeat_task = self._hass.async_create_background_task(
+                self._heartbeat_loop(),
+                'treeow-heartbeat'
+            )
 
+            # Main listening loop, runs at a fixed rate regardless of how long requests take
+            next_slot = time.monotonic()
+            while True:
                 try:
-                    if device_id in device_map:
-                        headers = await self._generate_common_headers()
-                        await self._poll_device(device_map[device_id], headers)
-                        
-                except Exception as e:
-                    _LOGGER.error(f'Failed to poll device {device_id} after control: {e}')
+                    # Cached headers, rebuilt only when the versions change
+                    headers = await self._generate_common_headers()
 
-            cancel_control_listen = listen_event(self._hass, EVENT_DEVICE_CONTROL, control_callback)
-            
-            # Signal gateway is online
-            fire_event(self._hass, EVENT_GATEWAY_STATUS_CHANGED, {'status': True})
+                    # Group due devices so each group is refreshed with a single list call,
+                    # a group whose previous poll is still running is left alone
+                    now = time.monotonic()
+                    group_map: Dict[str, List[TreeowDevice]] = {}
+                    skipped_groups = set()
+                    for device_id, device in self._listened_devices.items():
+                        if not self._poll_schedules[device_id].is_due(now):
+                            continue
+                        if device.group_id in in_flight:
+                            skipped_groups.add(device.group_id)
+                            continue
+                        group_map.setdefault(device.group_id, []).append(device)
+                    self._poll_stats['skipped_groups'] += len(skipped_groups)
 
-            # Generate headers once before loop (token refresh will reload integration)
-            headers = await self._generate_common_headers()
+                    # Poll groups concurrently, a poll is late when it is still running at the next slot
+                    deadline = next_slot + tick_interval
+                    for group_id, group_devices in group_map.items():
+                        task = self._hass.async_create_background_task(
+                            self._poll_group(group_id, group_devices, headers),
+                            f'treeow-poll-{group_id}'
+                        )
+                        in_flight[group_id] = task
+                        task.add_done_callback(lambda _, gid=group_id, d=deadline: self._on_group_polled(in_flight, gid, d))
 
-            # Main listening loop
-            while not signal.is_set():
-                try:
-                    # Poll devices concurrently for better performance
-                    tasks = []
-                    for device in target_devices:
-                        task = self._poll_device(device, headers)
-                        tasks.append(task)
-                    
-                    await asyncio.gather(*tasks, return_exceptions=True)
-                    await asyncio.sleep(poll_interval)
+                    next_slot = self._next_poll_slot(next_slot, tick_interval)
+                    await asyncio.sleep(max(0.0, next_slot - time.monotonic()))
                     
                     # Reset retry delay on successful operation
                     retry_delay = const.RETRY_DELAY
@@ -459,6 +662,7 @@ class TreeowClient:
                 except Exception as e:
                     _LOGGER.error(f'Device listening error: {e}, retrying in {retry_delay} seconds')
                     await asyncio.sleep(retry_delay)
+                    next_slot = time.monotonic()
                     
                     # Exponential backoff: double the delay for next retry
                     retry_delay = min(retry_delay * const.RETRY_MULTIPLIER, const.MAX_RETRY_DELAY)
@@ -466,42 +670,241 @@ class TreeowClient:
 
         finally:
             # Cleanup
-            if cancel_control_listen:
-                cancel_control_listen()
-                
-            # Stop heartbeat tasks
-            for task, heartbeat_signal in heartbeat_tasks:
-                heartbeat_signal.set()
-                try:
-                    task.cancel()
-                    await task
-                except asyncio.CancelledError:
-                    pass
-                    
-            # Signal gateway is offline
-            current_process = self._hass.data.get('current_listen_devices_process_id')
-            if process_id == current_process:
-                fire_event(self._hass, EVENT_GATEWAY_STATUS_CHANGED, {'status': False})
+            tasks = list(in_flight.values())
+            if heartbeat_task:
+                tasks.append(heartbeat_task)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._listened_devices = {}
+            self._poll_schedules = {}
+            self._device_health = {}
+            self._payload_fingerprints = {}
+            self._pending_values = {}
+            actors = list(self._command_actors.values())
+            self._command_actors = {}
+            await asyncio.gather(*[actor.stop() for actor in actors])
+
+    def submit_command(self, device: TreeowDevice, command: Dict[str, Any]) -> None:
+        """Queue a command on the device's actor, which serializes and coalesces writes. Event loop only."""
+        device_id = str(device.id)
+        actor = self._command_actors.get(device_id)
+        if actor is None:
+            actor = self._command_actors[device_id] = DeviceCommandActor(
+                self._hass,
+                device_id,
+                self._send_command,
+                lambda sent: self._follow_up_command(device_id, sent, self._optimistic_command)
+            )
+        actor.submit(device.to_dict(), command)
+
+    def set_listened_devices(self, devices: List[TreeowDevice]) -> None:
+        """Change the set of polled and heartbeated devices of a running listener in place."""
+        devices = {str(device.id): device for device in devices}
+        poll_interval, min_poll_interval, max_poll_interval = self._poll_config
+
+        for device_id in list(self._listened_devices):
+            if device_id not in devices:
+                self._poll_schedules.pop(device_id, None)
+                self._device_health.pop(device_id, None)
+                self._payload_fingerprints.pop(device_id, None)
+                self._pending_values.pop(device_id, None)
+                if self._heartbeat_scheduler:
+                    self._heartbeat_scheduler.remove(device_id)
+
+        for device_id in devices:
+            if device_id not in self._poll_schedules:
+                self._poll_schedules[device_id] = DevicePollSchedule(
+                    device_id, poll_interval, min_poll_interval, max_poll_interval
+                )
+                self._device_health[device_id] = DeviceHealth()
+                if self._heartbeat_scheduler:
+                    self._heartbeat_scheduler.add(device_id)
+
+        self._listened_devices = devices
+
+    def _next_poll_slot(self, slot: float, interval: float) -> float:
+        """Start of the next slot, slots the loop itself missed are skipped instead of bursting to catch up."""
+        self._poll_stats['cycles'] += 1
 
-    async def _poll_device(self, device: TreeowDevice, headers: Dict[str, str]) -> None:
+        next_slot = slot + interval
+        lag = time.monotonic() - next_slot
+        if lag <= 0:
+            return next_slot
+
+        missed = int(lag // interval) + 1
+        return next_slot + missed * interval
+
+    def _on_group_polled(self, in_flight: Dict[str, asyncio.Task], group_id: str, deadline: float) -> None:
+        """Record how far a finished group poll overran its slot."""
+        in_flight.pop(group_id, None)
+
+        stats = self._poll_stats
+        stats['group_polls'] += 1
+        overrun = time.monotonic() - deadline
+        if overrun <= 0:
+            stats['last_overrun'] = 0.0
+            return
+
+        stats['overrun_polls'] += 1
+        stats['last_overrun'] = overrun
+        stats['max_overrun'] = max(stats['max_overrun'], overrun)
+        _LOGGER.debug(f'Poll of group {group_id} overran its slot by {overrun:.3f} seconds')
+
+    async def _poll_group(self, group_id: str, devices: List[TreeowDevice], headers: Dict[str, str]) -> None:
+        """Poll all devices of a group with one list call, describing only the devices it left out."""
+        pending = {str(device.id): device for device in devices}
+
+        if group_id:
+            try:
+                async for page in self._iter_group_devices(group_id, headers, const.REQUEST_PRIORITY_BACKGROUND):
+                    for raw_device in page:
+                        device_id = str(raw_device.get('id'))
+                        if device_id not in pending:
+                            continue
+
+                        # Only accept entries that carry the current prop values
+                        props = raw_device.get('props')
+                        if not props or not props[0].get('value'):
+                            continue
+
+                        device = pending.pop(device_id)
+                        self._record_poll_result(device, raw_device, await self._parse_message(device, raw_device))
+
+                    # No need to fetch further pages once every polled device was found
+                    if not pending:
+                        break
+
+            except Exception as e:
+                _LOGGER.warning(f'Failed to poll group {group_id}: {e}, falling back to per-device polling')
+
+        if pending:
+            await asyncio.gather(*[self._poll_device(device, headers) for device in pending.values()])
+
+    async def _poll_device(
+            self,
+            device: TreeowDevice,
+            headers: Dict[str, str],
+            priority: int = const.REQUEST_PRIORITY_BACKGROUND
+    ) -> None:
         """Helper method to poll a single device."""
         try:
             payload = {"id": device.id}
-            async with self._session.post(url=const.DESCRIBE_DEVICES_API, json=payload, headers=headers) as response:
-                content = await response.json(content_type=None)
-                self._assert_response_successful(content)
-                
-                if content.get('data'):
-                    await self._parse_message(device, content['data'])
+            content = await self._request('post', const.DESCRIBE_DEVICES_API, headers, payload, priority)
+
+            if content.get('data'):
+                self._record_poll_result(device, content['data'], await self._parse_message(device, content['data']))
+            else:
+                self._record_poll_result(device, {}, None)
                     
         except Exception as e:
             _LOGGER.error(f'Failed to poll device {device.id}: {e}')
+            self._record_poll_result(device, {}, None)
 
-    async def _send_heartbeat(self, device: TreeowDevice, event: threading.Event) -> None:
-        """Optimized heartbeat sending with fast retry on failure."""
-        heartbeat_retry_delay = 1  # Start with 1 second for fast heartbeat recovery
-        
-        # Prepare fixed payload and headers once before loop
+    def _record_poll_result(self, device: TreeowDevice, msg: Dict[str, Any], changes: Optional[Dict[str, Any]]) -> None:
+        """Feed a poll outcome into the device's adaptive schedule and health."""
+        device_id = str(device.id)
+        schedule = self._poll_schedules.get(device_id)
+        health = self._device_health.get(device_id)
+        if schedule is None or health is None:
+            return
+
+        if changes is None:
+            schedule.on_failure()
+            changed = health.on_poll(False)
+        else:
+            online = self._is_online(msg)
+            schedule.on_result(bool(changes), device.attribute_snapshot_data, online)
+            changed = health.on_poll(True, online)
+
+        if not health.available:
+            schedule.on_unavailable()
+        if changed:
+            self._publish_availability(device_id, health)
+
+    def _publish_availability(self, device_id: str, health: DeviceHealth) -> None:
+        if health.available:
+            _LOGGER.info(f'Device {device_id} is available again')
+        else:
+            _LOGGER.warning(
+                f'Device {device_id} is unavailable (online: {health.online}, poll failures: {health.poll_failures}, '
+                f'heartbeat failures: {health.heartbeat_failures}), reprobing slowly'
+            )
+        dispatch_device_availability(self._hass, device_id, health.available)
+
+    def is_device_available(self, device_id: str) -> bool:
+        """Whether a device is considered reachable, devices not listened to count as available."""
+        health = self._device_health.get(str(device_id))
+        return health is None or health.available
+
+    @staticmethod
+    def _is_online(msg: Dict[str, Any]) -> bool:
+        """Read the device-reported online state, assuming online when it is not reported."""
+        for key in ('online', 'onlineStatus'):
+            if key in msg:
+                return str(msg[key]).lower() in ('1', 'true', 'online')
+        return True
+
+    def heartbeat_status(self, device_id: str) -> Optional[HeartbeatStatus]:
+        """Heartbeat outcome of a device, None when it is not being listened to."""
+        if self._heartbeat_scheduler is None:
+            return None
+        return self._heartbeat_scheduler.status(str(device_id))
+
+    async def _heartbeat_loop(self) -> None:
+        """Send heartbeats for all devices from one scheduler, spread evenly over the heartbeat interval."""
+        scheduler = HeartbeatScheduler(list(self._listened_devices), const.HEARTBEAT_INTERVAL)
+        self._heartbeat_scheduler = scheduler
+
+        try:
+            while True:
+                next_due = scheduler.next_due()
+                if next_due is None:
+                    await asyncio.sleep(const.HEARTBEAT_INTERVAL)
+                    continue
+
+                delay = next_due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+
+                beats = []
+                for device_id in scheduler.pop_due(time.monotonic()):
+                    if device_id not in self._listened_devices:
+                        scheduler.remove(device_id)
+                        continue
+
+                    # A recent successful poll already proves the device is reachable,
+                    # unavailable devices are left to the slow poll reprobe
+                    schedule = self._poll_schedules.get(device_id)
+                    if (schedule and schedule.succeeded_within(const.HEARTBEAT_INTERVAL)) or not self.is_device_available(device_id):
+                        scheduler.skip(device_id)
+                    else:
+                        beats.append(device_id)
+
+                if not beats:
+                    continue
+
+                results = await asyncio.gather(
+                    *[self._send_heartbeat(self._listened_devices[device_id]) for device_id in beats],
+                    return_exceptions=True
+                )
+                for device_id, result in zip(beats, results):
+                    success = not isinstance(result, Exception)
+                    status = scheduler.record(device_id, success)
+                    if status is not None and not success:
+                        _LOGGER.error(f'Device {device_id} heartbeat failed ({status.failures} in a row): {result}')
+
+                    health = self._device_health.get(device_id)
+                    if health is not None and health.on_heartbeat(success):
+                        self._publish_availability(device_id, health)
+
+        finally:
+            if self._heartbeat_scheduler is scheduler:
+                self._heartbeat_scheduler = None
+
+    async def _send_heartbeat(self, device: TreeowDevice) -> None:
+        """Send a single heartbeat for a device."""
         payload = {"value": 0}
         headers = (await self._generate_common_headers()).copy()
         headers.update({
@@ -511,87 +914,201 @@ class TreeowClient:
             'deviceserial': str(device.device_serial or ''),
             'resourcecategory': str(device.resourceCategory or '')
         })
-        
-        while not event.is_set():
-            try:
-                async with self._session.put(url=const.SYNC_DEVICES_API, json=payload, headers=headers) as response:
-                    content = await response.json(content_type=None)
-                    self._assert_response_successful(content)
-                    
-                # Reset retry delay on successful heartbeat, then wait normal interval
-                heartbeat_retry_delay = 1
-                await asyncio.sleep(const.HEARTBEAT_INTERVAL)
-                    
-            except Exception as e:
-                _LOGGER.error(f'Device {device.id} heartbeat failed: {e}, retrying in {heartbeat_retry_delay} seconds')
-                await asyncio.sleep(heartbeat_retry_delay)
-                
-                # Fast retry with small increments, but don't exceed heartbeat interval
-                heartbeat_retry_delay = min(heartbeat_retry_delay * 2, const.HEARTBEAT_INTERVAL)
-                _LOGGER.debug(f'Device {device.id} heartbeat next retry delay set to {heartbeat_retry_delay} seconds')
 
-    async def _parse_message(self, device: TreeowDevice, msg: Dict[str, Any]) -> None:
-        """Optimized message parsing."""
+        await self._request('put', const.SYNC_DEVICES_API, headers, payload, const.REQUEST_PRIORITY_BACKGROUND)
+
+    async def _parse_message(self, device: TreeowDevice, msg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parse a device message and publish only the values that changed.
+
+        Returns the changed values (empty when nothing changed) or None on failure.
+        """
         try:
             props = msg.get('props', [])
             if not props:
-                return
-                
-            data = json.loads(props[0]['value']).get(msg['category'], {})
-            values = {}
-            for attribute in device.attributes:
-                identifier = attribute.key
-                if identifier in data:
-                    values[identifier] = data[identifier]
-
-            fire_event(self._hass, EVENT_DEVICE_DATA_CHANGED, {
-                'deviceId': str(msg['id']),
-                'attributes': values
-            })
+                return None
+
+            device_id = str(device.id)
+            payload = props[0]['value']
+            last_values = device.attribute_snapshot_data
+            changes = {}
+
+            # The raw payload includes the device-reported timestamp, identical payloads need no decoding
+            if self._payload_fingerprints.get(device_id) != payload:
+                data = json.loads(payload).get(msg.get('category') or device.category, {})
+                for attribute in device.attributes:
+                    identifier = attribute.key
+                    if identifier in data and last_values.get(identifier) != data[identifier]:
+                        changes[identifier] = data[identifier]
+
+                self._payload_fingerprints[device_id] = payload
+                last_values.update(changes)
+
+            if device_id in self._pending_values:
+                self._resolve_pending_values(device, changes)
+
+            # The first live data of a restored device is published in full, so every entity drops its stale flag
+            if device.stale:
+                device.stale = False
+                dispatch_device_data(self._hass, device_id, dict(last_values))
+            elif changes:
+                dispatch_device_data(self._hass, device_id, changes)
+            return changes
             
         except Exception as e:
             _LOGGER.error(f'Failed to parse device message: {e}')
+            return None
+
+    async def _follow_up_command(self, device_id: str, sent: Dict[str, Any], optimistic: bool) -> None:
+        """Confirm a command burst, with one poll or with optimistic values the next scheduled poll confirms."""
+        device = self._listened_devices.get(device_id)
+        if device is None or not sent:
+            return
+
+        schedule = self._poll_schedules.get(device_id)
+        if schedule:
+            schedule.on_command()
+
+        # Fire-and-confirm: show the requested values now, the next scheduled poll confirms them
+        if optimistic:
+            self._apply_optimistic_values(device, sent)
+            return
+
+        # Single confirmation poll for the whole burst
+        headers = await self._generate_common_headers()
+        await self._poll_device(device, headers, const.REQUEST_PRIORITY_COMMAND)
+
+        values = device.attribute_snapshot_data
+        mismatched = {k: v for k, v in sent.items() if k in values and values[k] != v}
+        if mismatched:
+            _LOGGER.warning(f'Device {device_id} has not applied command values yet: {mismatched}')
+
+    def _apply_optimistic_values(self, device: TreeowDevice, command: Dict[str, Any]) -> None:
+        """Show the requested values on the entities until a poll confirms or the confirmation times out."""
+        device_id = str(device.id)
+        deadline = time.monotonic() + self._command_confirm_timeout
+        pending = self._pending_values.setdefault(device_id, {})
+        for identifier, value in command.items():
+            pending[identifier] = (value, deadline)
+
+        dispatch_device_data(self._hass, device_id, dict(command))
+
+    def _resolve_pending_values(self, device: TreeowDevice, changes: Dict[str, Any]) -> None:
+        """Confirm or roll back optimistic values against the real device values, updating changes in place."""
+        device_id = str(device.id)
+        pending = self._pending_values[device_id]
+        last_values = device.attribute_snapshot_data
+        now = time.monotonic()
+
+        for identifier, (value, deadline) in list(pending.items()):
+            actual = last_values.get(identifier)
+            if actual == value:
+                # Confirmed, the entities already show this value
+                del pending[identifier]
+                changes.pop(identifier, None)
+            elif now >= deadline:
+                del pending[identifier]
+                changes[identifier] = actual
+                _LOGGER.warning(f'Device {device_id} did not confirm {identifier}={value} within '
+                                f'{self._command_confirm_timeout} seconds, reverted to {actual}')
+            else:
+                # Keep showing the requested value until the deadline
+                changes.pop(identifier, None)
+
+        if not pending:
+            del self._pending_values[device_id]
 
     async def _send_command(self, device: Dict[str, Any], command: Dict[str, Any]) -> None:
-        """Optimized command sending."""
+        """Write all properties of a command concurrently under one shared deadline."""
         try:
             if not command:
                 return
-                
-            identifier = next(iter(command.keys()))
-            value = command[identifier]
-            
-            payload = {"value": value}
-            headers = (await self._generate_common_headers()).copy()
-            headers.update({
-                'domainidentifier': str(device.get('category', '')),
-                'propidentifier': str(identifier),
-                'localindex': str(device.get('localIndex', '')),
-                'deviceserial': str(device.get('device_serial', '')),
-                'resourcecategory': str(device.get('resourceCategory', ''))
-            })
-            
-            # Send command
-            async with self._session.put(url=const.SYNC_DEVICES_API, json=payload, headers=headers) as response:
-                content = await response.json(content_type=None)
-                self._assert_response_successful(content)
-            
-            # Verify command
-            async with self._session.get(url=const.SYNC_DEVICES_API, headers=headers) as response:
-                content = await response.json(content_type=None)
-                self._assert_response_successful(content)
-                
-                if content.get('data') != value:
-                    message = content.get('meta', {}).get('message', 'Unknown error')
-                    raise TreeowClientException(f'Command send failed: {message}')
+
+            headers = await self._generate_common_headers()
+            identifiers = list(command.keys())
+            results = await asyncio.wait_for(
+                asyncio.gather(
+                    *[self._write_property(device, identifier, command[identifier], headers) for identifier in identifiers],
+                    return_exceptions=True
+                ),
+                timeout=const.COMMAND_TIMEOUT
+            )
+
+            errors = [f'{identifier}: {result}' for identifier, result in zip(identifiers, results) if isinstance(result, Exception)]
+            if errors:
+                raise TreeowClientException(f'Command send failed: {"; ".join(errors)}')
                     
         except TreeowClientException as e:
             _LOGGER.error(f'Failed to send command: {e}')
             raise
+        except asyncio.TimeoutError:
+            _LOGGER.error(f'Failed to send command: timed out after {const.COMMAND_TIMEOUT} seconds')
+            raise TreeowClientException(f'Failed to send command: timed out after {const.COMMAND_TIMEOUT} seconds')
         except Exception as e:
             _LOGGER.error(f'Failed to send command: {e}')
             raise TreeowClientException(f'Failed to send command: {e}')
 
+    async def _write_property(self, device: Dict[str, Any], identifier: str, value: Any, headers: Dict[str, str]) -> None:
+        """Write a single property value, the caller confirms it with a poll."""
+        payload = {"value": value}
+        headers = headers.copy()
+        headers.update({
+            'domainidentifier': str(device.get('category', '')),
+            'propidentifier': str(identifier),
+            'localindex': str(device.get('localIndex', '')),
+            'deviceserial': str(device.get('device_serial', '')),
+            'resourcecategory': str(device.get('resourceCategory', ''))
+        })
+
+        await self._request('put', const.SYNC_DEVICES_API, headers, payload, const.REQUEST_PRIORITY_COMMAND)
+
+    async def _request(
+            self,
+            method: str,
+            url: str,
+            headers: Dict[str, str],
+            payload: Optional[Dict[str, Any]] = None,
+            priority: int = const.REQUEST_PRIORITY_NORMAL,
+            reauthenticate: bool = True
+    ) -> Dict[str, Any]:
+        """Send a request through the bounded executor and return the validated response content.
+
+        A request rejected for its access token is replayed once after the credentials are renewed.
+        """
+        try:
+            return await self._send_request(method, url, headers, payload, priority)
+        except TreeowAuthException:
+            if not reauthenticate:
+                raise
+
+        # Renew unless another request already did while this one was in flight
+        if headers.get('authorization') == f'Bearer {self._access_token}':
+            _LOGGER.info('Access token rejected, renewing it')
+            await self.reauthenticate()
+
+        headers = {**headers, 'authorization': f'Bearer {self._access_token}'}
+        return await self._send_request(method, url, headers, payload, priority)
+
+    async def _send_request(
+            self,
+            method: str,
+            url: str,
+            headers: Dict[str, str],
+            payload: Optional[Dict[str, Any]],
+            priority: int
+    ) -> Dict[str, Any]:
+        async def send() -> Dict[str, Any]:
+            kwargs = {'headers': headers, 'timeout': self._request_timeout}
+            if payload is not None:
+                kwargs['json'] = payload
+            async with self._session.request(method, url, **kwargs) as response:
+                if response.status in const.AUTH_ERROR_CODES:
+                    raise TreeowAuthException(f'API response error: HTTP {response.status}')
+                return await response.json(content_type=None)
+
+        content = await self._executor.run(send, priority)
+        self._assert_response_successful(content)
+        return content
+
     async def _generate_common_headers(self) -> Dict[str, str]:
         """Optimized header generation with caching."""
         if self._header_cache is None:
@@ -611,14 +1128,23 @@ class TreeowClient:
         """Optimized response validation."""
         if 'meta' in resp:
             meta = resp['meta']
-            if int(meta.get('code', 0)) != 200 or 'error' in str(meta):
-                raise TreeowClientException(f'API response error: {meta.get("message", "Unknown error")}')
+            code = int(meta.get('code', 0))
+            if code != 200 or 'error' in str(meta):
+                raise TreeowClient._response_exception(code, meta.get("message", "Unknown error"))
         elif 'result' in resp:
             result = resp['result']
-            if int(result.get('code', 0)) != 200 or 'error' in str(result):
-                raise TreeowClientException(f'API response error: {result.get("msg", "Unknown error")}')
+            code = int(result.get('code', 0))
+            if code != 200 or 'error' in str(result):
+                raise TreeowClient._response_exception(code, result.get("msg", "Unknown error"))
         else:
-            code = resp.get('code', 0)
+            code = int(resp.get('code', 0))
             msg = resp.get('msg', '')
-            if int(code) != 200 or 'error' in msg:
-                raise TreeowClientException(f'API response error: {msg or "Unknown error"}')
+            if code != 200 or 'error' in msg:
+                raise TreeowClient._response_exception(code, msg or "Unknown error")
+
+    @staticmethod
+    def _response_exception(code: int, msg: str) -> TreeowClientException:
+        """Classify a failed response, token rejections can be recovered by renewing the credentials."""
+        if code in const.AUTH_ERROR_CODES:
+            return TreeowAuthException(f'API response error: {msg}')
+        return TreeowClientException(f'API response error: {msg}')
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.treeow import const
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DeviceCommandActor:
+    """Mailbox of one device, commands are written in order and rapid writes to a property are coalesced.
+
+    Commands arriving within the debounce window form a burst. A newer write to a property updates the
+    pending one in place (last write wins) so it keeps its position, commands are sent one after another
+    in arrival order, and the burst ends with a single follow-up callback carrying everything that was sent.
+    """
+
+    __slots__ = ('_hass', '_device_id', '_send', '_on_burst', '_debounce', '_mailbox', '_task')
+
+    def __init__(
+            self,
+            hass: HomeAssistant,
+            device_id: str,
+            send: Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[None]],
+            on_burst: Callable[[Dict[str, Any]], Awaitable[None]],
+            debounce: float = const.COMMAND_DEBOUNCE
+    ):
+        self._hass = hass
+        self._device_id = device_id
+        self._send = send
+        self._on_burst = on_burst
+        self._debounce = debounce
+        self._mailbox: Deque[Tuple[Dict[str, Any], Dict[str, Any]]] = deque()
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, device: Dict[str, Any], command: Dict[str, Any]) -> None:
+        """Queue a command, pending writes to the same properties take the new values where they are queued."""
+        if not command:
+            return
+
+        added = {}
+        for identifier, value in command.items():
+            for _, pending in self._mailbox:
+                if identifier in pending:
+                    pending[identifier] = value
+                    break
+            else:
+                added[identifier] = value
+        if added:
+            self._mailbox.append((device, added))
+
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(self._run(), f'treeow-command-{self._device_id}')
+
+    async def stop(self) -> None:
+        """Drop pending commands and wait for the running burst to be cancelled."""
+        self._mailbox.clear()
+        task = self._task
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        try:
+            while self._mailbox:
+                # Let the burst settle before writing
+                await asyncio.sleep(self._debounce)
+
+                sent = {}
+                while self._mailbox:
+                    device, command = self._mailbox.popleft()
+                    if not command:
+                        continue
+                    try:
+                        await self._send(device, command)
+                        sent.update(command)
+                        _LOGGER.debug(f'Command sent successfully for device {self._device_id}: {command}')
+                    except Exception as e:
+                        _LOGGER.error(f'Failed to send command for device {self._device_id} with attributes {command}: {e}')
+
+                try:
+                    await self._on_burst(sent)
+                except Exception as e:
+                    _LOGGER.error(f'Failed to follow up command burst for device {self._device_id}: {e}')
+        finally:
+            self._task = None
@@ -5,7 +5,15 @@ from typing import List
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-from custom_components.treeow.const import FILTER_TYPE_EXCLUDE, FILTER_TYPE_INCLUDE, DEFAULT_POLL_INTERVAL
+from custom_components.treeow.const import (
+    FILTER_TYPE_EXCLUDE,
+    FILTER_TYPE_INCLUDE,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_COMMAND_CONFIRM_TIMEOUT,
+    DEFAULT_MAX_CONCURRENT_REQUESTS
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,6 +34,25 @@ class AccountConfig:
         self.expires_at: int = cfg.get('expires_at', 0)
         self.default_load_all_entity: bool = cfg.get('default_load_all_entity', True)
         self.poll_interval: int = cfg.get('poll_interval', DEFAULT_POLL_INTERVAL)
+        self.min_poll_interval: int = cfg.get('min_poll_interval', min(DEFAULT_MIN_POLL_INTERVAL, self.poll_interval))
+        self.max_poll_interval: int = cfg.get('max_poll_interval', max(DEFAULT_MAX_POLL_INTERVAL, self.poll_interval))
+        self.optimistic_command: bool = cfg.get('optimistic_command', False)
+        self.command_confirm_timeout: int = cfg.get('command_confirm_timeout', DEFAULT_COMMAND_CONFIRM_TIMEOUT)
+        self.max_concurrent_requests: int = cfg.get('max_concurrent_requests', DEFAULT_MAX_CONCURRENT_REQUESTS)
+
+    def settings(self) -> dict:
+        """Account settings with defaults filled in, without the credentials that rotate while running."""
+        return {
+            'account': self.account,
+            'password': self.password,
+            'default_load_all_entity': self.default_load_all_entity,
+            'poll_interval': self.poll_interval,
+            'min_poll_interval': self.min_poll_interval,
+            'max_poll_interval': self.max_poll_interval,
+            'optimistic_command': self.optimistic_command,
+            'command_confirm_timeout': self.command_confirm_timeout,
+            'max_concurrent_requests': self.max_concurrent_requests
+        }
 
     def save(self):
         self._hass.config_entries.async_update_entry(
@@ -33,13 +60,10 @@ class AccountConfig:
             data={
                 **self._config.data,
                 'account': {
-                    'account': self.account,
-                    'password': self.password,
+                    **self.settings(),
                     'access_token': self.access_token,
                     'refresh_token': self.refresh_token,
-                    'expires_at': self.expires_at,
-                    'default_load_all_entity': self.default_load_all_entity,
-                    'poll_interval': self.poll_interval
+                    'expires_at': self.expires_at
                 }
             }
         )
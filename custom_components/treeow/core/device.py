@@ -11,7 +11,7 @@ class TreeowDevice:
     """Optimized TreeowDevice with manual caching for better __slots__ compatibility."""
     
     __slots__ = ('_client', '_raw_data', '_attributes', '_attribute_snapshot_data', 
-                 '_device_dict_cache', '_cached_id', '_cached_name', '_cached_category')
+                 '_device_dict_cache', '_cached_id', '_cached_name', '_cached_category', 'stale')
 
     def __init__(self, client, raw: dict):
         self._client = client
@@ -19,6 +19,8 @@ class TreeowDevice:
         self._attributes = []
         self._attribute_snapshot_data = {}
         self._device_dict_cache = None
+        # True while values come from the persisted snapshot rather than the cloud
+        self.stale = False
         
         # Initialize cache attributes
         self._cached_id = None
@@ -61,6 +63,14 @@ class TreeowDevice:
         """Device version."""
         return self._raw_data.get('version')
 
+    @property
+    def product_id(self):
+        """Product ID, the part of the serial number before the colon."""
+        device_serial = self.device_serial
+        if not device_serial or ':' not in device_serial:
+            return None
+        return device_serial.split(':')[0]
+
     @property
     def group_id(self):
         """Group ID."""
@@ -82,6 +92,11 @@ class TreeowDevice:
             return props[0].get('localIndex')
         return None
 
+    @property
+    def raw_data(self) -> dict:
+        """Raw device data as returned by the device list."""
+        return self._raw_data
+
     @property
     def attributes(self) -> List[TreeowAttribute]:
         """Direct access to attributes list."""
@@ -89,7 +104,7 @@ class TreeowDevice:
 
     @property
     def attribute_snapshot_data(self) -> dict:
-        """Direct access to snapshot data."""
+        """Latest known values, kept current by polling."""
         return self._attribute_snapshot_data
 
     async def async_init(self):
@@ -97,36 +112,43 @@ class TreeowDevice:
         try:
             # Get snapshot data and attributes in one call
             snapshot_data, attributes = await self._client.get_device_snapshot_data(self)
-
-            # Initialize parser once
-            parser = V1SpecAttributeParser()
-            parsed_attributes = []
+            self._parse_attributes(snapshot_data, attributes)
             
-            for item in attributes:
-                try:
-                    attr = parser.parse_attribute(item, snapshot_data)
-                    if attr:
-                        parsed_attributes.append(attr)
-                except Exception as e:
-                    _LOGGER.warning("Device %s attribute %s parsing failed: %s", 
-                                   self.id, item.get('identifier', 'unknown'), str(e))
-
-            self._attributes.extend(parsed_attributes)
-
-            # Process global attributes
+        except Exception as e:
+            _LOGGER.error('Device %s initialization failed: %s', self.id, str(e))
+            raise
+
+    def restore(self, snapshot_data: dict, attributes: List[dict]) -> None:
+        """Initialize from persisted values and a cached digital model, without cloud requests."""
+        self._parse_attributes(dict(snapshot_data), attributes)
+        self.stale = True
+
+    def _parse_attributes(self, snapshot_data: dict, attributes: List[dict]) -> None:
+        # Initialize parser once
+        parser = V1SpecAttributeParser()
+        parsed_attributes = []
+
+        for item in attributes:
             try:
-                global_attrs = parser.parse_global(attributes, self.category)
-                if global_attrs:
-                    self._attributes.extend(global_attrs)
+                attr = parser.parse_attribute(item, snapshot_data)
+                if attr:
+                    parsed_attributes.append(attr)
             except Exception as e:
-                _LOGGER.warning("Device %s global attribute parsing failed: %s", self.id, str(e))
+                _LOGGER.warning("Device %s attribute %s parsing failed: %s", 
+                               self.id, item.get('identifier', 'unknown'), str(e))
 
-            # Store snapshot data
-            self._attribute_snapshot_data = snapshot_data
-            
+        self._attributes.extend(parsed_attributes)
+
+        # Process global attributes
+        try:
+            global_attrs = parser.parse_global(attributes, self.category)
+            if global_attrs:
+                self._attributes.extend(global_attrs)
         except Exception as e:
-            _LOGGER.error('Device %s initialization failed: %s', self.id, str(e))
-            raise
+            _LOGGER.warning("Device %s global attribute parsing failed: %s", self.id, str(e))
+
+        # Store snapshot data
+        self._attribute_snapshot_data = snapshot_data
 
     def __str__(self) -> str:
         """Optimized string representation using cached dict."""
@@ -1,89 +1,87 @@
-from typing import Callable, Coroutine, Any, Optional, Union
-import asyncio
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
 import logging
 
-from homeassistant.core import HomeAssistant, CALLBACK_TYPE, Event
-from homeassistant.util.async_ import run_callback_threadsafe
+from homeassistant.core import HomeAssistant, CALLBACK_TYPE
 
 from custom_components.treeow import DOMAIN
-from custom_components.treeow.const import (
-    EVENT_DEVICE_CONTROL,
-    EVENT_DEVICE_DATA_CHANGED,
-    EVENT_GATEWAY_STATUS_CHANGED
-)
 
 _LOGGER = logging.getLogger(__name__)
 
-# Cache for wrapped event names
-_EVENT_NAME_CACHE = {}
+# hass.data keys of the device data and availability dispatchers
+DATA_DEVICE_DISPATCHER = f'{DOMAIN}_device_dispatcher'
+DATA_DEVICE_AVAILABILITY_DISPATCHER = f'{DOMAIN}_device_availability_dispatcher'
 
 
-def wrap_event(name: str) -> str:
-    """Cached event name wrapping for better performance."""
-    if name not in _EVENT_NAME_CACHE:
-        _EVENT_NAME_CACHE[name] = f'{DOMAIN}_{name}'
-    return _EVENT_NAME_CACHE[name]
+class DeviceDispatcher:
+    """Deliver device data straight to the listeners of that device, bypassing the event bus.
 
+    A listener may name the keys it depends on, it is then woken only when one of them changed.
+    """
 
-def fire_event(hass: HomeAssistant, event: str, data: Optional[dict] = None) -> None:
-    """Fire an event with optional data and better error handling."""
-    if data is None:
-        data = {}
-    
-    try:
-        hass.bus.fire(wrap_event(event), data)
-    except Exception as e:
-        _LOGGER.error(f'Failed to fire event: {event}, error: {e}')
+    __slots__ = ('_listeners',)
 
+    def __init__(self):
+        self._listeners: Dict[str, List[Tuple[Callable[[dict], None], Optional[FrozenSet[str]]]]] = {}
 
-def listen_event(
+    def subscribe(
+            self,
+            device_id: str,
+            callback: Callable[[dict], None],
+            keys: Optional[Iterable[str]] = None
+    ) -> CALLBACK_TYPE:
+        listeners = self._listeners.setdefault(device_id, [])
+        listener = (callback, frozenset(keys) if keys is not None else None)
+        listeners.append(listener)
+
+        def unsubscribe() -> None:
+            if listener in listeners:
+                listeners.remove(listener)
+            if not listeners and self._listeners.get(device_id) is listeners:
+                del self._listeners[device_id]
+
+        return unsubscribe
+
+    def dispatch(self, device_id: str, data: dict) -> None:
+        for callback, keys in tuple(self._listeners.get(device_id, ())):
+            if keys is not None:
+                data_for_keys = {key: data[key] for key in keys if key in data}
+                if not data_for_keys:
+                    continue
+            else:
+                data_for_keys = data
+            try:
+                callback(data_for_keys)
+            except Exception as e:
+                _LOGGER.error(f'Device {device_id} data callback failed: {e}')
+
+
+def _get_device_dispatcher(hass: HomeAssistant, key: str = DATA_DEVICE_DISPATCHER) -> DeviceDispatcher:
+    dispatcher = hass.data.get(key)
+    if dispatcher is None:
+        dispatcher = hass.data[key] = DeviceDispatcher()
+    return dispatcher
+
+
+def dispatch_device_data(hass: HomeAssistant, device_id: str, data: dict) -> None:
+    """Deliver changed values to the entities of one device, must be called from the event loop."""
+    _get_device_dispatcher(hass).dispatch(device_id, data)
+
+
+def listen_device_data(
         hass: HomeAssistant,
-        event: str,
-        callback: Union[Callable[[Event], Coroutine[Any, Any, None]], Callable[[Event], None]]
+        device_id: str,
+        callback: Callable[[dict], None],
+        keys: Optional[Iterable[str]] = None
 ) -> CALLBACK_TYPE:
-    """Listen to an event with proper async callback handling and thread safety."""
-    wrapped_event = wrap_event(event)
-    
-    def thread_safe_callback_wrapper(event: Event) -> None:
-        """Thread-safe wrapper for callbacks."""
-        try:
-            result = callback(event)
-            # If callback returns a coroutine, handle it safely
-            if asyncio.iscoroutine(result):
-                # Use run_callback_threadsafe to ensure thread safety
-                def schedule_coroutine():
-                    """Schedule the coroutine in the event loop thread."""
-                    hass.async_create_task(
-                        _handle_async_callback(result, wrapped_event),
-                        f"treeow-event-{wrapped_event}"
-                    )
-                
-                # Ensure we're running in the event loop thread
-                if hass.loop.is_running():
-                    try:
-                        run_callback_threadsafe(hass.loop, schedule_coroutine)
-                    except Exception as e:
-                        _LOGGER.error(f'Failed to schedule async callback: {wrapped_event}, error: {e}')
-                        # Fallback: try to close the coroutine to avoid warnings
-                        try:
-                            result.close()
-                        except Exception:
-                            pass
-                else:
-                    _LOGGER.warning(f'Event loop not running, cannot handle async callback: {wrapped_event}')
-                    try:
-                        result.close()
-                    except Exception:
-                        pass
-        except Exception as e:
-            _LOGGER.error(f'Event callback execution failed: {wrapped_event}, error: {e}')
-    
-    return hass.bus.async_listen(wrapped_event, thread_safe_callback_wrapper)
-
-
-async def _handle_async_callback(coro: Coroutine[Any, Any, None], event_name: str) -> None:
-    """Handle async callback execution with error handling."""
-    try:
-        await coro
-    except Exception as e:
-        _LOGGER.error(f'Async event callback execution failed: {event_name}, error: {e}')
+    """Listen to data changes of one device, limited to the given keys when set, callbacks run on the event loop."""
+    return _get_device_dispatcher(hass).subscribe(device_id, callback, keys)
+
+
+def dispatch_device_availability(hass: HomeAssistant, device_id: str, available: bool) -> None:
+    """Deliver an availability change to the entities of one device, must be called from the event loop."""
+    _get_device_dispatcher(hass, DATA_DEVICE_AVAILABILITY_DISPATCHER).dispatch(device_id, {'available': available})
+
+
+def listen_device_availability(hass: HomeAssistant, device_id: str, callback: Callable[[dict], None]) -> CALLBACK_TYPE:
+    """Listen to availability changes of one device, callbacks run on the event loop."""
+    return _get_device_dispatcher(hass, DATA_DEVICE_AVAILABILITY_DISPATCHER).subscribe(device_id, callback)
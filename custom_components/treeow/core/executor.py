@@ -0,0 +1,81 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from custom_components.treeow import const
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class TreeowRequestExecutor:
+    """Bounded-concurrency gate for cloud requests, waiting requests are served by priority."""
+
+    __slots__ = ('_limit', '_active', '_waiters', '_sequence', '_stats')
+
+    def __init__(self, limit: int = const.DEFAULT_MAX_CONCURRENT_REQUESTS):
+        self._limit = max(1, int(limit))
+        self._active = 0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._stats = {'total': 0, 'queued_total': 0, 'max_queued': 0}
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth metrics."""
+        return {
+            'limit': self._limit,
+            'active': self._active,
+            'queued': len(self._waiters),
+            **self._stats
+        }
+
+    async def run(self, factory: Callable[[], Awaitable[T]], priority: int = const.REQUEST_PRIORITY_NORMAL) -> T:
+        """Run the request created by factory once a slot is free, lower priority values go first."""
+        await self._acquire(priority)
+        try:
+            return await factory()
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        self._stats['total'] += 1
+        if self._active < self._limit and not self._waiters:
+            self._active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), waiter)
+        heapq.heappush(self._waiters, entry)
+        self._stats['queued_total'] += 1
+        self._stats['max_queued'] = max(self._stats['max_queued'], len(self._waiters))
+        if len(self._waiters) == self._limit * 4:
+            _LOGGER.debug(f'Request queue depth reached {len(self._waiters)}')
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was already handed over, pass it on
+                self._release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def _release(self) -> None:
+        # Hand the slot straight to the next live waiter, a cancelled one may still be queued
+        # until its task gets to run its cleanup
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from custom_components.treeow import const
+
+_LOGGER = logging.getLogger(__name__)
+
+# Profile keys look like "PV(productId=xxx, version=1.0.0)"
+_PROFILE_KEY_PATTERN = re.compile(r'^PV\(productId=(?P<product_id>[^,]*),\s*version=(?P<version>.*)\)$')
+
+
+def profile_key(product_id: str, version: Any) -> Tuple[str, str]:
+    return str(product_id), str(version)
+
+
+class TreeowModelRegistry:
+    """Digital model profiles shared by all devices of the same product version."""
+
+    __slots__ = ('_profiles',)
+
+    def __init__(self):
+        self._profiles: Dict[Tuple[str, str], dict] = {}
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._profiles
+
+    def add_profiles(self, profiles: Optional[Dict[str, dict]]) -> None:
+        """Register the profiles returned alongside a device list."""
+        for name, profile in (profiles or {}).items():
+            match = _PROFILE_KEY_PATTERN.match(name)
+            if match is None:
+                _LOGGER.debug(f'Unrecognized digital model profile key: {name}')
+                continue
+            self._profiles[profile_key(match.group('product_id'), match.group('version'))] = profile
+
+    def get_props(self, key: Tuple[str, str], category: str) -> Optional[List[Dict[str, Any]]]:
+        """Props of a category in a registered profile, None when the profile is unknown."""
+        profile = self._profiles.get(key)
+        if profile is None:
+            return None
+
+        attributes = []
+        for resource in profile.get('resources', []):
+            for domain in resource.get('domains', []):
+                if domain.get('identifier') == category:
+                    attributes.extend(domain.get('props', []))
+        return attributes
+
+
+class TreeowModelStore:
+    """Persisted digital models, one entry per product version shared by all of its devices."""
+
+    __slots__ = ('_hass', '_store', '_models', '_load_task')
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._store = Store(hass, const.STORAGE_VERSION, f'{const.STORAGE_KEY}/{const.MODEL_STORAGE_NAME}')
+        self._models: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self._load_task: Optional[asyncio.Future] = None
+
+    async def async_load(self) -> None:
+        """Load the store once, concurrent callers wait for the same load."""
+        if self._load_task is None:
+            self._load_task = asyncio.ensure_future(self._async_load())
+        await asyncio.shield(self._load_task)
+
+    async def _async_load(self) -> None:
+        try:
+            data = await self._store.async_load()
+        except Exception as e:
+            _LOGGER.warning(f'Digital model cache is invalid: {e}')
+            data = None
+
+        if isinstance(data, dict) and isinstance(data.get('models'), dict):
+            self._models = data['models']
+        _LOGGER.debug(f'Loaded {len(self._models)} cached digital models')
+
+    def get(self, key: Tuple[str, str], category: str) -> Optional[List[Dict[str, Any]]]:
+        return self._models.get(self._storage_key(key), {}).get(str(category))
+
+    def set(self, key: Tuple[str, str], category: str, attributes: List[Dict[str, Any]]) -> None:
+        self._models.setdefault(self._storage_key(key), {})[str(category)] = attributes
+        self._schedule_save()
+
+    async def async_gc(self, keys_in_use: Iterable[Tuple[str, str]]) -> None:
+        """Drop models no device references any more, along with the legacy per-device cache files."""
+        in_use = {self._storage_key(key) for key in keys_in_use}
+        unused = [key for key in self._models if key not in in_use]
+        for key in unused:
+            del self._models[key]
+        if unused:
+            _LOGGER.debug(f'Removed {len(unused)} unused digital models')
+            self._schedule_save()
+
+        removed = await self._hass.async_add_executor_job(self._remove_legacy_files)
+        if removed:
+            _LOGGER.info(f'Removed {removed} legacy per-device digital model cache files')
+
+    def _remove_legacy_files(self) -> int:
+        # Older versions kept one "<category>_<id>.json" store per device next to the model store
+        path = self._hass.config.path('.storage', const.STORAGE_KEY)
+        if not os.path.isdir(path):
+            return 0
+
+        removed = 0
+        for name in os.listdir(path):
+            if name.endswith('.json'):
+                try:
+                    os.remove(os.path.join(path, name))
+                    removed += 1
+                except OSError as e:
+                    _LOGGER.warning(f'Failed to remove legacy cache file {name}: {e}')
+        return removed
+
+    def _schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, const.MODEL_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        return {'models': self._models}
+
+    @staticmethod
+    def _storage_key(key: Tuple[str, str]) -> str:
+        return f'{key[0]}|{key[1]}'
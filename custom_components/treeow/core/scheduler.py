@@ -0,0 +1,206 @@
+import heapq
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+
+from custom_components.treeow import const
+from custom_components.treeow.helpers import try_read_as_bool
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DevicePollSchedule:
+    """Per-device adaptive poll interval driven by device activity."""
+
+    __slots__ = ('_device_id', '_min_interval', '_max_interval', '_interval', '_next_due', '_last_success')
+
+    def __init__(self, device_id: str, poll_interval: float, min_interval: float, max_interval: float):
+        self._device_id = device_id
+        self._min_interval = min_interval
+        self._max_interval = max(max_interval, min_interval)
+        self._interval = min(max(poll_interval, self._min_interval), self._max_interval)
+        self._next_due = 0.0  # Poll immediately on start
+        self._last_success = None
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def next_due(self) -> float:
+        return self._next_due
+
+    def succeeded_within(self, seconds: float) -> bool:
+        """Whether the last successful poll is at most this many seconds old."""
+        return self._last_success is not None and time.monotonic() - self._last_success <= seconds
+
+    def is_due(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.monotonic()) >= self._next_due
+
+    def on_command(self) -> None:
+        """A command was just sent, watch the device closely."""
+        self._interval = self._min_interval
+        self._next_due = time.monotonic() + self._interval
+
+    def on_result(self, changed: bool, values: dict, online: bool = True) -> None:
+        """Adjust the interval from the outcome of a successful poll."""
+        self._last_success = time.monotonic()
+        if not online:
+            self._interval = self._max_interval * const.OFFLINE_POLL_MULTIPLIER
+        elif changed and self._is_on(values) is not False:
+            self._interval = self._min_interval
+        else:
+            self._back_off()
+        self._next_due = time.monotonic() + self._interval
+
+    def on_failure(self) -> None:
+        """Back off after a failed poll."""
+        self._back_off()
+        self._next_due = time.monotonic() + self._interval
+
+    def on_unavailable(self) -> None:
+        """The device is unavailable, only reprobe it slowly."""
+        self._interval = self._max_interval * const.OFFLINE_POLL_MULTIPLIER
+        self._next_due = time.monotonic() + self._interval
+
+    def _back_off(self) -> None:
+        interval = min(self._interval * const.POLL_BACKOFF_MULTIPLIER, self._max_interval)
+        if interval != self._interval:
+            _LOGGER.debug(f'Device {self._device_id} poll interval backed off to {interval:.1f} seconds')
+        self._interval = interval
+
+    @staticmethod
+    def _is_on(values: dict) -> Optional[bool]:
+        value = values.get('switch')
+        if value is None:
+            return None
+        try:
+            return try_read_as_bool(value)
+        except ValueError:
+            return None
+
+
+class DeviceHealth:
+    """Availability of a single device, derived from polls, heartbeats and its reported online state."""
+
+    __slots__ = ('available', 'online', 'poll_failures', 'heartbeat_failures')
+
+    def __init__(self):
+        self.available = True
+        self.online = True
+        self.poll_failures = 0
+        self.heartbeat_failures = 0
+
+    def on_poll(self, success: bool, online: bool = True) -> bool:
+        """Record a poll outcome, returns whether the availability changed."""
+        if success:
+            self.online = online
+            self.poll_failures = 0
+            if online:
+                # Fresh data from an online device outweighs earlier heartbeat failures
+                self.heartbeat_failures = 0
+        else:
+            self.poll_failures += 1
+        return self._evaluate()
+
+    def on_heartbeat(self, success: bool) -> bool:
+        """Record a heartbeat outcome, returns whether the availability changed."""
+        self.heartbeat_failures = 0 if success else self.heartbeat_failures + 1
+        return self._evaluate()
+
+    def _evaluate(self) -> bool:
+        failures = max(self.poll_failures, self.heartbeat_failures)
+        available = self.online and failures < const.DEVICE_UNAVAILABLE_FAILURES
+        changed = available != self.available
+        self.available = available
+        return changed
+
+
+class HeartbeatStatus:
+    """Heartbeat outcome of a single device."""
+
+    __slots__ = ('last_success', 'last_failure', 'failures', 'retry_delay')
+
+    def __init__(self):
+        self.last_success: Optional[float] = None
+        self.last_failure: Optional[float] = None
+        self.failures = 0
+        self.retry_delay = const.HEARTBEAT_RETRY_DELAY
+
+
+class HeartbeatScheduler:
+    """Single timing heap that spreads the heartbeats of all devices evenly over the interval."""
+
+    __slots__ = ('_interval', '_heap', '_status', '_due')
+
+    def __init__(self, device_ids: List[str], interval: float):
+        self._interval = interval
+        self._heap = []
+        self._status: Dict[str, HeartbeatStatus] = {}
+        # The one live heap entry per device, others are leftovers of earlier schedules
+        self._due: Dict[str, float] = {}
+
+        now = time.monotonic()
+        slot = interval / max(len(device_ids), 1)
+        for index, device_id in enumerate(device_ids):
+            self._status[device_id] = HeartbeatStatus()
+            self._schedule(device_id, now + index * slot + self._jitter())
+
+    def add(self, device_id: str) -> None:
+        if device_id in self._status:
+            return
+        self._status[device_id] = HeartbeatStatus()
+        self._push(device_id, random.uniform(0, self._interval))
+
+    def remove(self, device_id: str) -> None:
+        # Heap entries of removed devices are dropped when they come due
+        self._status.pop(device_id, None)
+        self._due.pop(device_id, None)
+
+    def status(self, device_id: str) -> Optional[HeartbeatStatus]:
+        return self._status.get(device_id)
+
+    def next_due(self) -> Optional[float]:
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[str]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, device_id = heapq.heappop(self._heap)
+            if self._due.get(device_id) == due_at:
+                del self._due[device_id]
+                due.append(device_id)
+        return due
+
+    def skip(self, device_id: str) -> None:
+        """No beat needed this round, the device was reached recently."""
+        self._push(device_id, self._interval)
+
+    def record(self, device_id: str, success: bool) -> Optional[HeartbeatStatus]:
+        status = self._status.get(device_id)
+        if status is None:
+            return None
+        now = time.monotonic()
+        if success:
+            status.last_success = now
+            status.failures = 0
+            status.retry_delay = const.HEARTBEAT_RETRY_DELAY
+            self._push(device_id, self._interval)
+        else:
+            status.last_failure = now
+            status.failures += 1
+            # Fast retry with small increments, but don't exceed heartbeat interval
+            self._push(device_id, status.retry_delay)
+            status.retry_delay = min(status.retry_delay * 2, self._interval)
+        return status
+
+    def _push(self, device_id: str, delay: float) -> None:
+        self._schedule(device_id, time.monotonic() + delay + self._jitter())
+
+    def _schedule(self, device_id: str, due_at: float) -> None:
+        self._due[device_id] = due_at
+        heapq.heappush(self._heap, (due_at, device_id))
+
+    def _jitter(self) -> float:
+        return random.uniform(0, self._interval * const.HEARTBEAT_JITTER)
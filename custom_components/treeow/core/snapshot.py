@@ -0,0 +1,86 @@
+import logging
+from typing import Any, Dict, List
+
+from homeassistant.core import HomeAssistant, CALLBACK_TYPE
+from homeassistant.helpers.storage import Store
+
+from custom_components.treeow import const
+from .device import TreeowDevice
+from .event import listen_device_data
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TreeowSnapshotStore:
+    """Persisted device list and last known values, used to bring entities up before the cloud answers."""
+
+    __slots__ = ('_store', '_devices', '_unsubscribes', '_hass')
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._hass = hass
+        self._store = Store(hass, const.STORAGE_VERSION, f'{const.STORAGE_KEY}/{const.SNAPSHOT_STORAGE_NAME}_{entry_id}')
+        self._devices: List[TreeowDevice] = []
+        self._unsubscribes: List[CALLBACK_TYPE] = []
+
+    async def async_restore(self, client) -> List[TreeowDevice]:
+        """Rebuild the persisted devices, marked stale, from the loaded digital model cache."""
+        try:
+            data = await self._store.async_load()
+        except Exception as e:
+            _LOGGER.warning(f'Device snapshot is invalid: {e}')
+            return []
+
+        if not isinstance(data, dict):
+            return []
+
+        devices = []
+        for item in data.get('devices', []):
+            try:
+                device = TreeowDevice(client, item['raw'])
+                attributes = client.get_cached_digital_model(device)
+                if attributes is None:
+                    # Without its model the device can't be rebuilt, let discovery do a cold start
+                    _LOGGER.debug(f'Device {device.id} digital model is not cached, snapshot not usable')
+                    return []
+                device.restore(item.get('values', {}), attributes)
+                devices.append(device)
+            except Exception as e:
+                _LOGGER.warning(f'Failed to restore device from snapshot: {e}')
+                return []
+
+        return devices
+
+    def track(self, devices: List[TreeowDevice]) -> None:
+        """Persist these devices now and again, batched, whenever their values change."""
+        self._unsubscribe()
+        self._devices = list(devices)
+        for device in self._devices:
+            self._unsubscribes.append(listen_device_data(self._hass, str(device.id), self._on_device_data))
+        self._store.async_delay_save(self._data_to_save, 0)
+
+    async def async_stop(self) -> None:
+        """Stop tracking and flush the batched values, a pending delayed save would be lost on unload."""
+        self._unsubscribe()
+        if not self._devices:
+            return
+        try:
+            await self._store.async_save(self._data_to_save())
+        except Exception as e:
+            _LOGGER.warning(f'Failed to save device snapshot: {e}')
+
+    def _unsubscribe(self) -> None:
+        for unsubscribe in self._unsubscribes:
+            unsubscribe()
+        self._unsubscribes.clear()
+
+    def _on_device_data(self, data: dict) -> None:
+        if data:
+            self._store.async_delay_save(self._data_to_save, const.SNAPSHOT_SAVE_DELAY)
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        return {
+            'devices': [
+                {'raw': device.raw_data, 'values': device.attribute_snapshot_data}
+                for device in self._devices
+            ]
+        }
@@ -1,14 +1,13 @@
 import logging
 from abc import ABC, abstractmethod
+from typing import Tuple
 
-from homeassistant.core import Event
 from homeassistant.helpers.entity import DeviceInfo, Entity
 
 from . import DOMAIN
-from .const import EVENT_DEVICE_CONTROL, EVENT_DEVICE_DATA_CHANGED, EVENT_GATEWAY_STATUS_CHANGED
 from .core.attribute import TreeowAttribute
 from .core.device import TreeowDevice
-from .core.event import listen_event, fire_event
+from .core.event import listen_device_data, listen_device_availability
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,7 +15,8 @@ _LOGGER = logging.getLogger(__name__)
 class TreeowAbstractEntity(Entity, ABC):
     """Optimized abstract entity with reduced memory footprint."""
 
-    __slots__ = ('_device', '_attribute', '_attributes_data', '_listen_cancel', '_device_id')
+    __slots__ = ('_device', '_attribute', '_attributes_data', '_listen_cancel', '_device_id',
+                 '_device_available', '_value_available')
 
     def __init__(self, device: TreeowDevice, attribute: TreeowAttribute):
         self._device_id = str(device.id)
@@ -38,13 +38,30 @@ class TreeowAbstractEntity(Entity, ABC):
         self._attribute = attribute
         self._attributes_data = {}
         self._listen_cancel = []
+        # Device health comes from the client, value readability from the entity itself
+        self._device_available = True
+        self._value_available = True
 
     def _send_command(self, attributes):
-        """Send control command with optimized event firing."""
-        fire_event(self.hass, EVENT_DEVICE_CONTROL, {
-            'device': self._device.to_dict(),
-            'attributes': attributes
-        })
+        """Queue a control command on the client, called from the event loop by the async service methods."""
+        client = self.hass.data[DOMAIN].get('client')
+        if client is None:
+            _LOGGER.warning(f'Client not ready, dropped command for device {self._device_id}: {attributes}')
+            return
+        client.submit_command(self._device, attributes)
+
+    @property
+    def available(self) -> bool:
+        return self._device_available and self._value_available
+
+    @property
+    def extra_state_attributes(self):
+        """Flag values restored from the snapshot until the cloud confirms them."""
+        return {'stale': True} if self._device.stale else None
+
+    def _watched_keys(self) -> Tuple[str, ...]:
+        """Attribute keys this entity depends on, it is only woken when one of them changes."""
+        return self._attribute.key,
 
     @abstractmethod
     def _update_value(self):
@@ -52,28 +69,26 @@ class TreeowAbstractEntity(Entity, ABC):
 
     async def async_added_to_hass(self) -> None:
         """Optimized entity setup with efficient event handling."""
-        def status_callback(event):
-            self._attr_available = event.data['status']
-            self.schedule_update_ha_state()
-        
-        self._listen_cancel.append(listen_event(self.hass, EVENT_GATEWAY_STATUS_CHANGED, status_callback))
-
-        def data_callback(event):
-            event_data = event.data
-            if event_data['deviceId'] != self._device_id:
-                return
-            
-            self._attributes_data = event_data['attributes']
+        def availability_callback(data: dict):
+            self._device_available = data['available']
+            self.async_write_ha_state()
+
+        self._listen_cancel.append(listen_device_availability(self.hass, self._device_id, availability_callback))
+
+        def data_callback(attributes: dict):
+            # Updates only carry the changed values
+            self._attributes_data.update(attributes)
             self._update_value()
-            self.schedule_update_ha_state()
+            self.async_write_ha_state()
 
-        self._listen_cancel.append(listen_event(self.hass, EVENT_DEVICE_DATA_CHANGED, data_callback))
+        self._listen_cancel.append(listen_device_data(self.hass, self._device_id, data_callback, self._watched_keys()))
 
-        # Initialize with snapshot data
-        data_callback(Event('', data={
-            'deviceId': self._device_id,
-            'attributes': self._device.attribute_snapshot_data
-        }))
+        # Initialize with the current availability and snapshot data
+        client = self.hass.data[DOMAIN].get('client')
+        if client is not None:
+            self._device_available = client.is_device_available(self._device_id)
+        self._attributes_data.update(self._device.attribute_snapshot_data)
+        self._update_value()
 
     async def async_will_remove_from_hass(self) -> None:
         """Optimized cleanup with batch operation."""
@@ -1,5 +1,5 @@
 import logging
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
@@ -125,6 +125,10 @@ class TreeowFan(TreeowAbstractEntity, FanEntity):
         display_mode = self._mode_comparison_table.get(mode_value)
         return display_mode if display_mode in self._mode_options else None
     
+    def _watched_keys(self) -> Tuple[str, ...]:
+        keys = (self._attr_key, self._switch_key, self._speed_key, self._mode_key)
+        return tuple(key for key in dict.fromkeys(keys) if key)
+
     def _update_value(self):
         pass
 
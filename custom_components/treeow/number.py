@@ -48,6 +48,6 @@ class TreeowNumber(TreeowAbstractEntity, NumberEntity):
             _LOGGER.warning(f'Number [{self._attr_unique_id}] value type conversion failed: {value}')
             self._attr_native_value = None
 
-    def set_native_value(self, value: float) -> None:
+    async def async_set_native_value(self, value: float) -> None:
         """Set the native value with optimized command sending."""
         self._send_command({self._attr_key: int(value)})
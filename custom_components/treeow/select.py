@@ -58,7 +58,7 @@ class TreeowSelect(TreeowAbstractEntity, SelectEntity):
             _LOGGER.warning(f'Select [{self._attr_unique_id}] value [{value}] not in options list')
             self._attr_current_option = str(value)
 
-    def select_option(self, option: str) -> None:
+    async def async_select_option(self, option: str) -> None:
         """Select an option with optimized reverse lookup."""
         if option == self._attr_current_option:
             return
@@ -45,20 +45,18 @@ class TreeowSwitch(TreeowAbstractEntity, SwitchEntity):
             
         try:
             self._attr_is_on = try_read_as_bool(value)
-            # Reset availability if previously failed
-            if not self._attr_available:
-                self._attr_available = True
+            self._value_available = True
         except ValueError:
             _LOGGER.warning(f'Switch [{self._attr_unique_id}] failed to read value: {value}')
-            self._attr_available = False
+            self._value_available = False
 
-    def turn_on(self, **kwargs: Any) -> None:
+    async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
         if self._attr_is_on:
             return
         self._send_command({self._attr_key: True})
 
-    def turn_off(self, **kwargs: Any) -> None:
+    async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the switch off."""
         if not self._attr_is_on:
             return
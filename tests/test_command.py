@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('homeassistant')
+
+from custom_components.treeow.core.command import DeviceCommandActor
+
+
+class _FakeHass:
+
+    def async_create_background_task(self, coro, name):
+        return asyncio.get_running_loop().create_task(coro, name=name)
+
+
+async def _run_burst(*commands):
+    sent = []
+    bursts = []
+
+    async def send(device, command):
+        sent.append(command)
+
+    async def on_burst(burst):
+        bursts.append(burst)
+
+    actor = DeviceCommandActor(_FakeHass(), '1', send, on_burst, debounce=0.01)
+    for command in commands:
+        actor.submit({'id': '1'}, command)
+    await asyncio.sleep(0.1)
+    await actor.stop()
+    return sent, bursts
+
+
+def test_repeated_write_keeps_its_position():
+    sent, bursts = asyncio.run(_run_burst({'switch': True, 'speed': 3}, {'switch': True, 'mode': 1}))
+
+    assert sent == [{'switch': True, 'speed': 3}, {'mode': 1}]
+    assert bursts == [{'switch': True, 'speed': 3, 'mode': 1}]
+
+
+def test_last_write_wins():
+    sent, bursts = asyncio.run(_run_burst({'speed': 1}, {'speed': 2}, {'speed': 3}))
+
+    assert sent == [{'speed': 3}]
+    assert bursts == [{'speed': 3}]
+
+
+def test_separate_bursts_follow_up_separately():
+    sent = []
+    bursts = []
+
+    async def send(device, command):
+        sent.append(command)
+
+    async def on_burst(burst):
+        bursts.append(burst)
+
+    async def scenario():
+        actor = DeviceCommandActor(_FakeHass(), '1', send, on_burst, debounce=0.01)
+        actor.submit({'id': '1'}, {'speed': 1})
+        await asyncio.sleep(0.1)
+        actor.submit({'id': '1'}, {'speed': 2})
+        await asyncio.sleep(0.1)
+        await actor.stop()
+
+    asyncio.run(scenario())
+
+    assert sent == [{'speed': 1}, {'speed': 2}]
+    assert bursts == [{'speed': 1}, {'speed': 2}]
+
+
+def test_failed_send_is_left_out_of_the_burst():
+    bursts = []
+
+    async def send(device, command):
+        if 'mode' in command:
+            raise RuntimeError('rejected')
+
+    async def on_burst(burst):
+        bursts.append(burst)
+
+    async def scenario():
+        actor = DeviceCommandActor(_FakeHass(), '1', send, on_burst, debounce=0.01)
+        actor.submit({'id': '1'}, {'speed': 2})
+        actor.submit({'id': '1'}, {'mode': 1})
+        await asyncio.sleep(0.1)
+        await actor.stop()
+
+    asyncio.run(scenario())
+
+    assert bursts == [{'speed': 2}]
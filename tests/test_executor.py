@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('homeassistant')
+
+from custom_components.treeow.core.executor import TreeowRequestExecutor
+
+
+async def _cancel_while_queued():
+    executor = TreeowRequestExecutor(1)
+    release_first = asyncio.Event()
+
+    async def first():
+        await release_first.wait()
+        return 'first'
+
+    async def queued():
+        return 'queued'
+
+    running = asyncio.ensure_future(executor.run(first))
+    await asyncio.sleep(0)
+    waiting = asyncio.ensure_future(executor.run(queued))
+    await asyncio.sleep(0)
+    assert executor.stats['queued'] == 1
+
+    # Let the running request finish before the cancelled task gets to clean up its queue entry
+    release_first.set()
+    waiting.cancel()
+    assert await running == 'first'
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    stats = executor.stats
+    assert stats['active'] == 0
+    assert stats['queued'] == 0
+
+    # The slot is free again
+    assert await asyncio.wait_for(executor.run(queued), 1) == 'queued'
+
+
+def test_cancel_while_queued_releases_slot():
+    asyncio.run(_cancel_while_queued())